@@ -5,8 +5,54 @@ Networking Layer (Like URLSession in Swift)
 This mimics how you build networking layers in iOS.
 """
 
-from typing import Optional, TypeVar, Generic
+from typing import AsyncIterator, Iterator, Optional, TypeVar, Generic
+from collections import OrderedDict, deque
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import codecs
+import contextlib
+import contextvars
+import hashlib
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import tempfile
+import zlib
 import json
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    HAS_REQUESTS = True
+
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import brotli  # pip3 install brotli (optional codec)
+
+    HAS_BROTLI = True
+
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import zstandard  # pip3 install zstandard (optional codec)
+
+    HAS_ZSTD = True
+
+except ImportError:
+    HAS_ZSTD = False
 
 # ============================================================================
 # EXERCISE: Build a Generic API Client (Swift-style)
@@ -26,61 +72,1857 @@ class APIResponse(Generic[T]):
         return self.error is None
 
 
+# ============================================================================
+# TRANSPORT: Pooled keep-alive sessions (like a shared URLSession)
+# ============================================================================
+
+# Swift:
+# let session = URLSession(configuration: .default)
+# config.httpMaximumConnectionsPerHost = 10
+#
+# Python: one requests.Session per base_url. The session keeps TCP/TLS
+# connections alive and hands them back to a pool after every call, so only
+# the first request to a host pays for the handshake.
+
+class PooledTransport:
+    """
+    One keep-alive connection pool per base_url
+    pool_size       -> how many connections are kept open per host
+    max_per_host    -> hard cap on concurrent connections to one host
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 10,
+                 max_per_host: Optional[int] = None):
+        if not HAS_REQUESTS:
+            raise RuntimeError("requests not installed: pip3 install requests")
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host or pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,             # one host per transport
+            pool_maxsize=self.max_per_host,
+            pool_block=max_per_host is not None,  # wait instead of opening extra sockets
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_transports: dict[tuple[str, int, Optional[int]], PooledTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(base_url: str, pool_size: int = 10,
+                  max_per_host: Optional[int] = None) -> PooledTransport:
+    """
+    Shared transport for base_url (like URLSession.shared, but per host)
+    Clients asking for different pool settings get their own transport.
+    """
+    key = (base_url, pool_size, max_per_host)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = PooledTransport(base_url, pool_size, max_per_host)
+            _transports[key] = transport
+        return transport
+
+
+def close_transports():
+    """Close every pooled session (call on shutdown)"""
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
+
+
+# ============================================================================
+# RESPONSE CACHE (like URLCache)
+# ============================================================================
+
+# Swift:
+# let cache = URLCache(memoryCapacity: 10_000_000, diskCapacity: 0)
+# config.urlCache = cache
+#
+# Python: an OrderedDict is an LRU list for free - move_to_end() on every hit,
+# popitem(last=False) evicts the least recently used entry. Entries stay fresh
+# for `ttl` seconds; after that we revalidate with If-None-Match /
+# If-Modified-Since, and a 304 costs headers only - no body transfer.
+
+class CacheEntry:
+    """One cached GET response (raw body + validators)"""
+
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache with a byte-size cap
+    max_entries -> LRU eviction once exceeded
+    max_bytes   -> LRU eviction once the cached bodies exceed this size
+    ttl         -> seconds an entry is served without asking the server
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 10_000_000,
+                 ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0  # stale entries confirmed by a 304
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, headers: dict[str, str]) -> tuple:
+        return (url, tuple(sorted(headers.items())))
+
+    def lookup(self, key: tuple) -> tuple[Optional[CacheEntry], bool]:
+        """Return (entry, is_fresh); entry is None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+            return entry, time.monotonic() - entry.stored_at < self.ttl
+
+    def store(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            if entry.size > self.max_bytes:
+                return  # would evict everything else; don't cache
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                self.evictions += 1
+
+    def count(self, counter: str):
+        """Thread-safe += 1 on a counter (hits, misses)"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def refresh(self, entry: CacheEntry):
+        """Server answered 304: the entry is fresh again"""
+        with self._lock:
+            entry.stored_at = time.monotonic()
+            self.revalidations += 1
+
+    def invalidate(self, url_prefix: str):
+        """Drop every entry whose URL starts with url_prefix (after writes)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(url_prefix)]:
+                self.total_bytes -= self._entries.pop(key).size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
+
+
+# ============================================================================
+# DEADLINES (one time budget for a whole call tree)
+# ============================================================================
+
+# timeout=10 on every call is a local decision: a handler with 2s left calls
+# a helper that calls the API with its own 10s timeout, and then retries.
+# The caller gave up long ago, but the work carries on. A Deadline is the
+# budget for everything inside the block, stored in a ContextVar - so it
+# flows into nested calls, and into tasks created inside it (each task
+# copies the current context) - without threading a parameter through:
+#   - nested Deadlines can only shorten it, never extend it
+#   - time_budget(timeout) gives each call min(timeout, time left), so
+#     APIClient / AsyncAPIClient attempts and RetryPolicy backoffs fit inside
+#   - `async with Deadline(...)` also cancels the block when it expires
+#     (asyncio.timeout underneath); the sync form can only shorten timeouts
+# Like Swift's Task cancellation, it is cooperative: it bounds awaits and
+# socket timeouts, not a CPU loop that never yields.
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The enclosing Deadline ran out (a TimeoutError, so existing handlers still catch it)"""
+
+
+class Deadline:
+    """
+    Time budget (seconds) for everything inside the block
+    Usage:
+        with Deadline(2.0):        client.get(...)   # timeouts shortened to fit
+        async with Deadline(2.0):  await work()      # ... and cancelled at expiry
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at: Optional[float] = None  # time.monotonic() value
+        self._token = None
+        self._timeout = None
+
+    def __enter__(self):
+        expires_at = time.monotonic() + self.seconds
+        outer = _DEADLINE.get()
+        self.expires_at = expires_at if outer is None else min(outer, expires_at)
+        self._token = _DEADLINE.set(self.expires_at)
+        return self
+
+    def __exit__(self, *exc_info):
+        _DEADLINE.reset(self._token)
+
+    async def __aenter__(self):
+        self.__enter__()
+        self._timeout = asyncio.timeout(max(0.0, self.expires_at - time.monotonic()))
+        await self._timeout.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._timeout.__aexit__(exc_type, exc, tb)
+        except TimeoutError as e:  # our timer fired (not a TimeoutError from inside)
+            raise DeadlineExceeded(f"deadline of {self.seconds}s exceeded") from e
+        finally:
+            self.__exit__()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current Deadline (None: no deadline set)"""
+    expires_at = _DEADLINE.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def time_budget(timeout: Optional[float] = None) -> Optional[float]:
+    """timeout shortened to fit the current Deadline; DeadlineExceeded if none is left"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("deadline expired before the call started")
+    return left if timeout is None else min(timeout, left)
+
+
+def shared_context() -> contextvars.Context:
+    """Copy of the current context minus the Deadline - for work several callers share"""
+    context = contextvars.copy_context()
+    context.run(_DEADLINE.set, None)
+    return context
+
+
+async def await_shared(task: asyncio.Future):
+    """
+    Wait for work shared with other callers, within this caller's Deadline
+    The shield keeps this caller's timeout or cancellation from cancelling it.
+    """
+    timeout = asyncio.timeout(time_budget())
+    try:
+        async with timeout:
+            return await asyncio.shield(task)
+    except TimeoutError as e:
+        if timeout.expired():  # our budget ran out, not a TimeoutError from the work
+            raise DeadlineExceeded("deadline exceeded waiting for a shared call") from e
+        raise
+
+
+# ============================================================================
+# RETRIES (exponential backoff + full jitter + retry budget)
+# ============================================================================
+
+# Swift has no built-in retry for URLSession - you'd write a loop around
+# `try await session.data(for:)`. Same here, but the loop lives in ONE place
+# (RetryPolicy) and both APIClient (time.sleep) and AsyncAPIClient
+# (asyncio.sleep) go through it.
+#
+# - Full jitter: sleep random(0, min(max_delay, base_delay * 2**attempt)) so
+#   clients that failed together don't retry together.
+# - Idempotency: only GET/DELETE are retried by default - retrying a POST
+#   could create the same user twice.
+# - Retry budget: a token bucket shared by all calls. Every retry spends a
+#   token, every first-try success earns a fraction of one back. When the
+#   upstream is down the bucket empties and we stop multiplying its load.
+
+RETRYABLE_ERRORS = (OSError, EOFError)  # incl. ConnectionError, TimeoutError, requests' errors
+
+
+class RetryBudget:
+    """Token bucket limiting retries to roughly `ratio` of successful calls"""
+
+    def __init__(self, max_tokens: float = 10.0, ratio: float = 0.1):
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryStats:
+    """Counters + recent per-attempt latencies for one RetryPolicy"""
+
+    def __init__(self, keep_latencies: int = 1000):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.budget_exhausted = 0  # retries skipped because the bucket was empty
+        self.attempt_latencies: deque[float] = deque(maxlen=keep_latencies)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, first_attempt: bool):
+        with self._lock:
+            self.attempts += 1
+            self.calls += first_attempt
+            self.attempt_latencies.append(latency)
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.attempt_latencies)
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "budget_exhausted": self.budget_exhausted,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before trying a call again
+    Usage:
+        policy = RetryPolicy(max_attempts=4)
+        client = APIClient(url, retry=policy)         # sync
+        aclient = AsyncAPIClient(url, retry=policy)   # async, same budget
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1,
+                 max_delay: float = 5.0, methods: tuple[str, ...] = ("GET", "DELETE"),
+                 statuses: tuple[int, ...] = (429, 502, 503, 504),
+                 budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.methods = methods
+        self.statuses = statuses
+        self.budget = budget if budget is not None else RetryBudget()
+        self.stats = RetryStats()
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, capped exponential) before retry #attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _next_delay(self, method: str, attempt: int, status: Optional[int],
+                    error: Optional[BaseException]) -> Optional[float]:
+        """Seconds to sleep before the next attempt, or None to stop here"""
+        failed = error is not None or status in self.statuses
+        if not failed:
+            if attempt == 1:
+                self.budget.deposit()
+            return None
+        if method.upper() not in self.methods or attempt >= self.max_attempts:
+            return None
+        if error is not None and (not isinstance(error, RETRYABLE_ERRORS)
+                                  or isinstance(error, DeadlineExceeded)):
+            return None
+        delay = self.backoff(attempt)
+        left = remaining()
+        if left is not None and delay >= left:
+            return None  # the retry would start after the caller's deadline
+        if not self.budget.try_withdraw():
+            self.stats.count("budget_exhausted")
+            return None
+        self.stats.count("retries")
+        return delay
+
+    def call(self, method: str, send):
+        """Run send() (returns a response with a status) with retries - sync"""
+        attempt = 1
+        while True:
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                result = send()
+            except Exception as e:
+                error = e
+            self.stats.record(time.perf_counter() - start, attempt == 1)
+            delay = self._next_delay(method, attempt, _status_of(result), error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, method: str, send):
+        """Same as call(), but send is an async function and sleeps don't block"""
+        attempt = 1
+        while True:
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                result = await send()
+            except Exception as e:
+                error = e
+            self.stats.record(time.perf_counter() - start, attempt == 1)
+            delay = self._next_delay(method, attempt, _status_of(result), error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _status_of(result) -> Optional[int]:
+    """HTTP status of a requests.Response / HTTPResult (None for anything else)"""
+    return getattr(result, "status_code", getattr(result, "status", None))
+
+
+# ============================================================================
+# RATE LIMITING + CIRCUIT BREAKER (protecting a degraded upstream)
+# ============================================================================
+
+# RateLimiter: token bucket per host. Each call takes one token; tokens refill
+# at `rate` per second up to `burst`. A caller that finds the bucket empty
+# reserves the next token and sleeps until it's due - time.sleep() in
+# threads, asyncio.sleep() in coroutines - so the host never sees more than
+# `rate` req/s from this process, however many workers we run. A 429 with
+# Retry-After pauses the whole bucket.
+#
+# CircuitBreaker: after `failure_threshold` consecutive failures the circuit
+# OPENS and calls fail immediately (no socket, no timeout to wait out). After
+# `reset_timeout` it goes HALF_OPEN and lets a trial call through: success
+# CLOSES it again, failure re-opens it.
+
+class RateLimiter:
+    """Thread- and asyncio-safe token bucket: `rate` calls/sec, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly one not refilled yet); return seconds to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """Await a token without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Upstream said 429 + Retry-After: nobody calls it for `seconds`"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str, rate: float, burst: int = 1) -> RateLimiter:
+    """
+    Shared limiter for the host of base_url (all clients to one host share it)
+    Asking again for the same host with a different rate/burst is a ValueError:
+    two buckets for one host would let through the sum of both rates.
+    """
+    host = urlsplit(base_url).netloc
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            limiter = _rate_limiters[host] = RateLimiter(rate, burst)
+        elif (limiter.rate, limiter.burst) != (rate, burst):
+            raise ValueError(f"{host} already limited to rate={limiter.rate}, "
+                             f"burst={limiter.burst}; got rate={rate}, burst={burst}")
+        return limiter
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    closed -> open -> half_open -> closed (or back to open)
+    Observe transitions via breaker.transitions or on_state_change(old, new).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str = "", failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, on_state_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.listeners = [on_state_change] if on_state_change else []
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0  # calls failed fast while open
+        self.transitions: list[tuple[float, str, str]] = []  # (time, old, new)
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._trial_calls = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, new_state: str) -> tuple[str, str]:
+        """Switch state (lock held); return the transition for _announce()"""
+        old_state, self.state = self.state, new_state
+        self.transitions.append((time.time(), old_state, new_state))
+        return old_state, new_state
+
+    def _announce(self, change: Optional[tuple[str, str]]):
+        # Called after the lock is released: listeners may call back into the breaker
+        if change is not None:
+            for listener in self.listeners:
+                listener(*change)
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out"""
+        change = None
+        try:
+            with self._lock:
+                if self.state == self.OPEN:
+                    if time.monotonic() - self._opened_at < self.reset_timeout:
+                        self.rejected += 1
+                        raise CircuitOpenError(f"circuit open for {self.name or 'host'}")
+                    change = self._set_state(self.HALF_OPEN)
+                    self._half_opened_at = time.monotonic()
+                    self._trial_calls = 0
+                if self.state == self.HALF_OPEN:
+                    if self._trial_calls >= self.half_open_max_calls:
+                        if time.monotonic() - self._half_opened_at < self.reset_timeout:
+                            self.rejected += 1
+                            raise CircuitOpenError(f"circuit half-open for {self.name or 'host'}")
+                        # Trials that never reported back: start a fresh round
+                        self._half_opened_at = time.monotonic()
+                        self._trial_calls = 0
+                    self._trial_calls += 1
+        finally:
+            self._announce(change)
+
+    def release_trial(self):
+        """Give back the slot of a call that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def after_call(self, status: Optional[int], error: Optional[BaseException]):
+        """Record the outcome: exceptions, 5xx and 429 count as failures"""
+        failed = error is not None or (status is not None and (status >= 500 or status == 429))
+        change = None
+        with self._lock:
+            if not failed:
+                self.failures = 0
+                if self.state != self.CLOSED:
+                    change = self._set_state(self.CLOSED)
+            else:
+                self.failures += 1
+                if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and self.failures >= self.failure_threshold
+                ):
+                    self._opened_at = time.monotonic()
+                    change = self._set_state(self.OPEN)
+        self._announce(change)
+
+
+def _retry_after(headers) -> Optional[float]:
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
 class APIClient:
     """
     Simple API Client
     Similar to your URLSession + custom networking layer in Swift
     """
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, pool_size: int = 10,
+                 max_per_host: Optional[int] = None, timeout: float = 10,
+                 cache: Optional[ResponseCache] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 compress_requests: Optional[str] = None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json"}
+        self.timeout = timeout
+        self.compress_requests = compress_requests  # e.g. "gzip" for POST bodies
+        self.transport = get_transport(base_url, pool_size, max_per_host)
+        self.cache = cache  # opt-in: APIClient(url, cache=ResponseCache())
+        self.retry = retry  # opt-in: APIClient(url, retry=RetryPolicy())
+        self.rate_limiter = rate_limiter  # e.g. get_rate_limiter(url, rate=50)
+        self.breaker = breaker
     
     def build_url(self, endpoint: str) -> str:
         """Build full URL"""
         return f"{self.base_url}/{endpoint}"
     
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Hit/miss/revalidation/eviction counters (empty without a cache)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    @property
+    def retry_stats(self) -> dict:
+        """Calls/attempts/retries and per-attempt latency (empty without a policy)"""
+        return self.retry.stats.snapshot() if self.retry is not None else {}
+    
+    def _send(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """One logical request = one or more attempts through the retry policy"""
+        def attempt():
+            timeout = time_budget(self.timeout)  # fits the caller's Deadline, if any
+            if self.breaker is not None:
+                self.breaker.before_call()  # fail fast, before waiting on the limiter
+            try:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                response = self.transport.request(method, url, timeout=timeout, **kwargs)
+            except Exception as e:
+                if self.breaker is not None:
+                    self.breaker.after_call(None, e)
+                raise
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.release_trial()  # interrupted: no verdict on the host
+                raise
+            if self.breaker is not None:
+                self.breaker.after_call(response.status_code, None)
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.pause(_retry_after(response.headers) or 1.0)
+            return response
+        if self.retry is None:
+            return attempt()
+        return self.retry.call(method, attempt)
+    
     def get(self, endpoint: str) -> APIResponse[dict]:
-        """
-        Simulate GET request
-        In real code: use 'requests' library
-        """
+        """GET request over the pooled keep-alive session"""
         try:
             url = self.build_url(endpoint)
-            # TODO: In real usage, this would be:
-            # response = requests.get(url, headers=self.headers)
-            # return APIResponse(data=response.json())
-            
-            # For now, mock response:
-            mock_data = {
-                "users": [
-                    {"id": 1, "name": "Alice"},
-                    {"id": 2, "name": "Bob"}
-                ]
-            }
-            return APIResponse(data=mock_data)
+            if self.cache is not None:
+                return self._cached_get(url)
+            response = self._send("GET", url, headers=self.headers)
+            response.raise_for_status()
+            return APIResponse(data=response.json())
         
         except Exception as e:
             return APIResponse(error=str(e))
     
+    def _cached_get(self, url: str) -> APIResponse[dict]:
+        cache = self.cache
+        key = cache.make_key(url, self.headers)
+        entry, is_fresh = cache.lookup(key)
+        if entry is not None and is_fresh:
+            cache.count("hits")
+            return APIResponse(data=json.loads(entry.body))
+        
+        headers = dict(self.headers)
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        
+        response = self._send("GET", url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            cache.refresh(entry)
+            return APIResponse(data=json.loads(entry.body))
+        
+        response.raise_for_status()
+        cache.count("misses")
+        if "no-store" not in response.headers.get("Cache-Control", ""):
+            cache.store(key, CacheEntry(
+                response.content,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            ))
+        return APIResponse(data=response.json())
+    
+    def stream(self, endpoint: str, key: Optional[str] = "users",
+               chunk_size: int = 65536) -> Iterator[dict]:
+        """
+        GET endpoint and yield the records of its `key` array as they arrive
+        Unlike get(), errors raise: records are produced after the call returns.
+        """
+        url = self.build_url(endpoint)
+        with self.transport.request("GET", url, headers=self.headers,
+                                    timeout=time_budget(self.timeout), stream=True) as response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(chunk_size), key)
+    
     def post(self, endpoint: str, body: dict) -> APIResponse[dict]:
-        """Simulate POST request"""
+        """POST request over the pooled keep-alive session"""
         try:
             url = self.build_url(endpoint)
-            # TODO: requests.post(url, json=body, headers=self.headers)
-            return APIResponse(data={"success": True, "id": 123})
+            if self.compress_requests:
+                data = CODECS[self.compress_requests].compress(json.dumps(body).encode())
+                headers = {**self.headers, "Content-Encoding": self.compress_requests}
+                response = self._send("POST", url, data=data, headers=headers)
+            else:
+                response = self._send("POST", url, json=body, headers=self.headers)
+            response.raise_for_status()
+            if self.cache is not None:
+                self.cache.invalidate(url)
+            return APIResponse(data=response.json())
         
         except Exception as e:
             return APIResponse(error=str(e))
 
 
+# ============================================================================
+# ASYNC CLIENT (like URLSession's async data(from:) API)
+# ============================================================================
+
+# Swift:
+# let (data, _) = try await URLSession.shared.data(from: url)
+#
+# Python: asyncio streams speak HTTP/1.1 directly, so the event loop is never
+# blocked. Connections are kept alive in a shared pool and a semaphore caps
+# how many are open at once, so 10,000 gathered calls still use <= N sockets.
+
+class HTTPResult:
+    """Raw HTTP response: status code, lower-cased headers and body bytes"""
+
+    def __init__(self, status: int, headers: dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class _BodyStream:
+    """Async iterator over one response body (Content-Length, chunked or until EOF)"""
+
+    chunk_size = 65536
+
+    def __init__(self, reader: asyncio.StreamReader, status: int, headers: dict[str, str]):
+        self.reader = reader
+        self.headers = headers
+        self.finished = False
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+        if status in (204, 304) or status < 200:
+            self._mode, self._remaining = "length", 0
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            self._mode, self._remaining = "chunked", 0
+        elif "content-length" in headers:
+            self._mode, self._remaining = "length", int(headers["content-length"])
+        else:
+            self._mode, self._remaining = "eof", 0
+            self.keep_alive = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self.finished:
+            raise StopAsyncIteration
+        if self._mode == "length":
+            if self._remaining == 0:
+                self.finished = True
+                raise StopAsyncIteration
+            data = await self.reader.readexactly(min(self._remaining, self.chunk_size))
+            self._remaining -= len(data)
+            return data
+        if self._mode == "chunked":
+            if self._remaining == 0:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()  # trailing CRLF
+                    self.finished = True
+                    raise StopAsyncIteration
+                self._remaining = size
+            data = await self.reader.readexactly(min(self._remaining, self.chunk_size))
+            self._remaining -= len(data)
+            if self._remaining == 0:
+                await self.reader.readexactly(2)  # CRLF after each chunk
+            return data
+        data = await self.reader.read(self.chunk_size)
+        if not data:
+            self.finished = True
+            raise StopAsyncIteration
+        return data
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self])
+
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class AsyncConnectionPool:
+    """Keep-alive asyncio connections to one host, at most max_connections open"""
+
+    def __init__(self, base_url: str, max_connections: int = 100):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.use_tls = parts.scheme == "https"
+        self.port = parts.port or (443 if self.use_tls else 80)
+        self.max_connections = max_connections
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.connections_opened = 0
+        self.addresses: list[str] = []  # from resolve(); empty = DNS on every connect
+        self.closed = False
+        self._ssl: Optional[ssl.SSLContext] = None
+
+    @property
+    def address(self) -> Optional[str]:
+        """The resolved address connections go to first (the last one that answered)"""
+        return self.addresses[0] if self.addresses else None
+
+    async def _open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self.closed:
+            raise RuntimeError("connection pool is closed")
+        self.connections_opened += 1
+        if self.use_tls and self._ssl is None:
+            self._ssl = ssl.create_default_context()  # loads the CA bundle: do it once
+        if not self.addresses:
+            return await self._connect(self.host)
+        # Like open_connection(host): try every resolved address in turn
+        errors = []
+        for address in list(self.addresses):
+            try:
+                connection = await self._connect(address)
+            except OSError as e:
+                errors.append(e)
+                continue
+            if address != self.addresses[0]:  # start with the one that answers next time
+                self.addresses.remove(address)
+                self.addresses.insert(0, address)
+            return connection
+        if len(errors) == 1:
+            raise errors[0]
+        raise OSError(f"connect to {self.host}:{self.port} failed on every address: "
+                      + "; ".join(map(str, errors)))
+
+    def _connect(self, address: str):
+        return asyncio.open_connection(
+            address, self.port, ssl=self._ssl,
+            server_hostname=self.host if self.use_tls else None,
+        )
+
+    async def resolve(self) -> list[str]:
+        """Look the host up once; connections then skip DNS and try these addresses in order"""
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            self.host, self.port, type=socket.SOCK_STREAM)
+        self.addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        return self.addresses
+
+    async def warm_up(self, count: int) -> int:
+        """Open up to count connections concurrently and park them as idle"""
+        count = max(0, min(count, self.max_connections) - len(self._idle))
+        opened = await asyncio.gather(*(self._open() for _ in range(count)),
+                                      return_exceptions=True)
+        fresh = [conn for conn in opened if not isinstance(conn, BaseException)]
+        self._idle.extend(fresh)
+        if count and not fresh:
+            raise opened[0]
+        return len(fresh)
+
+    async def request(self, method: str, path: str, headers: dict[str, str],
+                      body: bytes = b"") -> HTTPResult:
+        async with self.stream(method, path, headers, body) as (status, response_headers, chunks):
+            encoding = response_headers.pop("content-encoding", None)
+            data = b"".join([piece async for piece in decode_body(chunks, encoding)])
+        return HTTPResult(status, response_headers, data)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method: str, path: str, headers: dict[str, str], body: bytes = b""):
+        """
+        Send a request and yield (status, headers, body chunks) without reading the body
+        The connection goes back to the pool only if the body was read to the end.
+        """
+        async with self._semaphore:
+            reused = False
+            while self._idle:
+                reader, writer = self._idle.pop()
+                if not reader.at_eof():
+                    reused = True
+                    break
+                writer.close()  # the server closed it while idle: drop it, nothing sent
+            if not reused:
+                reader, writer = await self._open()
+            try:
+                status, response_headers = await self._send(reader, writer, method, path, headers, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused or method.upper() not in IDEMPOTENT_METHODS:
+                    raise  # the server may have acted on it: a POST must not go twice
+                # Server closed an idle keep-alive socket: retry once on a fresh one
+                reader, writer = await self._open()
+                try:
+                    status, response_headers = await self._send(reader, writer, method, path, headers, body)
+                except BaseException:
+                    writer.close()
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+
+            chunks = _BodyStream(reader, status, response_headers)
+            try:
+                yield status, response_headers, chunks
+            except BaseException:
+                writer.close()
+                raise
+            if chunks.finished and chunks.keep_alive and not self.closed:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+
+    async def _send(self, reader, writer, method, path, headers, body) -> tuple[int, dict[str, str]]:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+
+        response_headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        return status, response_headers
+
+    async def close(self):
+        """Close the idle connections; ones in use close when returned, new ones are refused"""
+        self.closed = True
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one underlying call
+    The first caller starts the work; everyone arriving while it is in flight
+    awaits the same task and gets the same result. Once it finishes the key is
+    forgotten, so the next call goes upstream again (this is not a cache).
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self.calls = 0      # underlying calls actually made
+        self.coalesced = 0  # callers that piggy-backed on one in flight
+
+    async def do(self, key: tuple, make_call):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            # Not in the first caller's context: its Deadline would cut the
+            # call short for every caller that joins. Each waiter enforces
+            # its own Deadline in await_shared instead.
+            task = asyncio.get_running_loop().create_task(make_call(), context=shared_context())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await await_shared(task)
+
+
+class AsyncAPIClient:
+    """
+    asyncio version of APIClient - same APIResponse[T] results
+    Usage:
+        async with AsyncAPIClient(base_url, max_concurrency=50) as client:
+            responses = await asyncio.gather(*(client.get(f"users/{i}") for i in ids))
+    """
+
+    def __init__(self, base_url: str, max_concurrency: int = 100, timeout: float = 10,
+                 coalesce: bool = True, retry: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 compression: bool = True, compress_requests: Optional[str] = None):
+        self.base_url = base_url
+        self.headers = {"Content-Type": "application/json"}
+        if compression:
+            self.headers["Accept-Encoding"] = accept_encoding()
+        self.compress_requests = compress_requests  # e.g. "gzip" for POST bodies
+        self.timeout = timeout  # per attempt
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.pool = AsyncConnectionPool(base_url, max_connections=max_concurrency)
+        self._base_path = urlsplit(base_url).path.rstrip("/")
+        # Identical GETs in flight at the same time share one request
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if coalesce else None
+        # Logical requests started and not finished - including ones sleeping
+        # in a retry backoff or waiting on the rate limiter (see drain())
+        self.in_flight = 0
+        self._quiet = asyncio.Event()
+        self._quiet.set()
+
+    def build_url(self, endpoint: str) -> str:
+        """Build full URL"""
+        return f"{self.base_url}/{endpoint}"
+
+    @contextlib.asynccontextmanager
+    async def _tracked(self):
+        self.in_flight += 1
+        self._quiet.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._quiet.set()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for in-flight requests to finish; False if the timeout hit first"""
+        try:
+            await asyncio.wait_for(self._quiet.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _request(self, method: str, endpoint: str,
+                       body: Optional[dict] = None) -> HTTPResult:
+        payload = json.dumps(body).encode() if body is not None else b""
+        path = f"{self._base_path}/{endpoint}"
+        headers = self.headers
+        if payload and self.compress_requests:
+            payload = CODECS[self.compress_requests].compress(payload)
+            headers = {**headers, "Content-Encoding": self.compress_requests}
+
+        async def attempt() -> HTTPResult:
+            timeout = time_budget(self.timeout)
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.aacquire()
+                result = await asyncio.wait_for(
+                    self.pool.request(method, path, headers, payload), timeout=timeout
+                )
+            except Exception as e:
+                if self.breaker is not None:
+                    self.breaker.after_call(None, e)
+                raise
+            except BaseException:
+                if self.breaker is not None:
+                    # cancelled (hedge loser, Deadline, closed fan-out): not the host's fault
+                    self.breaker.release_trial()
+                raise
+            if self.breaker is not None:
+                self.breaker.after_call(result.status, None)
+            if result.status == 429 and self.rate_limiter is not None:
+                self.rate_limiter.pause(_retry_after(result.headers) or 1.0)
+            return result
+
+        async with self._tracked():
+            if self.retry is None:
+                result = await attempt()
+            else:
+                result = await self.retry.acall(method, attempt)
+        result.raise_for_status()
+        return result
+
+    @property
+    def retry_stats(self) -> dict:
+        """Calls/attempts/retries and per-attempt latency (empty without a policy)"""
+        return self.retry.stats.snapshot() if self.retry is not None else {}
+
+    async def get(self, endpoint: str, hedge=None) -> APIResponse[dict]:
+        """
+        Async GET request (concurrent identical GETs are coalesced)
+        hedge: a HedgePolicy (03_exercise_async.py) - slow calls get a duplicate.
+        Hedged GETs bypass single-flight (a duplicate that joined the original
+        would never reach the server), and only a successful response wins.
+        """
+        if hedge is not None:
+            return await self._get(endpoint, hedge)
+        if self.single_flight is None:
+            return await self._get(endpoint)
+        key = ("GET", self.build_url(endpoint), tuple(sorted(self.headers.items())))
+        try:
+            return await self.single_flight.do(key, lambda: self._get(endpoint))
+        except DeadlineExceeded as e:  # this caller's budget ran out; the call goes on
+            return APIResponse(error=str(e))
+
+    async def _get(self, endpoint: str, hedge=None) -> APIResponse[dict]:
+        try:
+            if hedge is None:
+                result = await self._request("GET", endpoint)
+            else:
+                result = await hedge.run(lambda: self._request("GET", endpoint))
+            return APIResponse(data=result.json())
+        except Exception as e:
+            return APIResponse(error=str(e) or type(e).__name__)
+
+    async def stream(self, endpoint: str, key: Optional[str] = "users") -> AsyncIterator[dict]:
+        """
+        Async iterator over the records of the `key` array, as they arrive
+        Usage: async for user in client.stream("users"): ...
+        Like requests' timeout, self.timeout bounds each read (the response
+        headers, then every chunk), shortened to fit the current Deadline.
+        The timeout is never held across a yield - the consumer's time
+        between records isn't the server's.
+        """
+        parser = JSONArrayStream(key)
+        path = f"{self._base_path}/{endpoint}"
+        async with contextlib.AsyncExitStack() as stack:
+            await stack.enter_async_context(self._tracked())
+            async with asyncio.timeout(time_budget(self.timeout)):
+                status, headers, chunks = await stack.enter_async_context(
+                    self.pool.stream("GET", path, self.headers))
+            if status >= 400:
+                raise RuntimeError(f"HTTP {status}")
+            body = decode_body(chunks, headers.get("content-encoding"))
+            stack.push_async_callback(body.aclose)
+            while True:
+                try:
+                    async with asyncio.timeout(time_budget(self.timeout)):
+                        chunk = await anext(body)
+                except StopAsyncIteration:
+                    break
+                for record in parser.feed(chunk):
+                    yield record
+        for record in parser.close():
+            yield record
+
+    async def post(self, endpoint: str, body: dict) -> APIResponse[dict]:
+        """Async POST request"""
+        try:
+            result = await self._request("POST", endpoint, body)
+            return APIResponse(data=result.json())
+        except Exception as e:
+            return APIResponse(error=str(e) or type(e).__name__)
+
+    async def delete(self, endpoint: str) -> APIResponse[bool]:
+        """Async DELETE request"""
+        try:
+            await self._request("DELETE", endpoint)
+            return APIResponse(data=True)
+        except Exception as e:
+            return APIResponse(error=str(e) or type(e).__name__)
+
+    async def aclose(self):
+        await self.pool.close()
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+# ============================================================================
+# COMPRESSION (Accept-Encoding / Content-Encoding)
+# ============================================================================
+
+# URLSession sends `Accept-Encoding: gzip, deflate, br` and decodes for you.
+# requests does the same for the sync client (gzip/deflate, plus br/zstd when
+# those packages are installed). For the asyncio client we do it ourselves:
+# advertise every codec we have, and decompress chunk by chunk as the body
+# arrives - each decompressed piece goes straight into the JSON decoder
+# (JSONArrayStream), so the full decompressed body never sits in memory.
+
+class _StreamAdapter:
+    """Give brotli/zstd (de)compressors zlib's compress|decompress() + flush() shape"""
+
+    def __init__(self, obj, step: str, finish: Optional[str] = None):
+        self._step = getattr(obj, step)
+        self._finish = getattr(obj, finish) if finish else None
+
+    def compress(self, data: bytes) -> bytes:
+        return self._step(data)
+
+    decompress = compress
+
+    def flush(self) -> bytes:
+        return self._finish() if self._finish else b""
+
+
+class Codec:
+    """One Content-Encoding: factories for streaming compressor/decompressor objects"""
+
+    def __init__(self, name: str, compressor, decompressor):
+        self.name = name
+        self.compressor = compressor
+        self.decompressor = decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = self.decompressor()
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+CODECS: dict[str, Codec] = {
+    "gzip": Codec(
+        "gzip",
+        lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS),
+        lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    ),
+}
+if HAS_BROTLI:
+    CODECS["br"] = Codec(
+        "br",
+        lambda: _StreamAdapter(brotli.Compressor(quality=5), "process", "finish"),
+        lambda: _StreamAdapter(brotli.Decompressor(), "process"),
+    )
+if HAS_ZSTD:
+    CODECS["zstd"] = Codec(
+        "zstd",
+        lambda: zstandard.ZstdCompressor(level=3).compressobj(),
+        lambda: _StreamAdapter(zstandard.ZstdDecompressor().decompressobj(), "decompress"),
+    )
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value for every codec available, best first"""
+    return ", ".join(name for name in ("zstd", "br", "gzip") if name in CODECS)
+
+
+def choose_encoding(accept: Optional[str]) -> Optional[str]:
+    """Server side: first codec in the client's Accept-Encoding that we support"""
+    for item in (accept or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name in CODECS and params.replace(" ", "") != "q=0":
+            return name
+    return None
+
+
+async def decode_body(chunks, encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Decompress an async stream of body chunks as they arrive"""
+    if not encoding or encoding == "identity":
+        async for chunk in chunks:
+            yield chunk
+        return
+    if encoding not in CODECS:
+        raise ValueError(f"unsupported Content-Encoding: {encoding}")
+    decompressor = CODECS[encoding].decompressor()
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+# ============================================================================
+# STREAMING JSON (records as they arrive, constant memory)
+# ============================================================================
+
+# response.json() needs the whole body in memory - for a 500 MB `users` array
+# that's 500 MB of bytes plus every dict at once. JSONArrayStream is a push
+# parser: feed() it bytes as they come off the socket and it returns each
+# complete element of the array, so only one record (plus one network chunk)
+# is alive at a time.
+
+class JSONArrayStream:
+    """
+    Incremental parser for the elements of one JSON array
+    key="users" -> stream {"users": [...], ...}; key=None -> stream a top-level [...]
+    """
+
+    _WHITESPACE = " \t\r\n"
+    _DELIMITERS = _WHITESPACE + ",:]}"
+
+    def __init__(self, key: Optional[str] = "users"):
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"  # start -> keys -> items -> done
+
+    def feed(self, chunk: bytes) -> list:
+        """Add bytes, return the array elements completed by them"""
+        self._buf = self._buf[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """End of input: return what's left, raise if the document was cut off"""
+        self._buf = self._buf[self._pos:] + self._text.decode(b"", final=True)
+        self._pos = 0
+        items = self._parse(final=True)
+        if self._state != "done":
+            raise ValueError(f"incomplete JSON: array {self.key!r} not closed")
+        return items
+
+    def _skip(self, chars: str = _WHITESPACE) -> Optional[str]:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in chars:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _decode_value(self, final: bool):
+        """Decode one value at the cursor; None if more input is needed"""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        if not final and (end == len(self._buf) or self._buf[end] not in self._DELIMITERS):
+            return None  # a number cut off mid-way: `12` / `2.` might become `123` / `2.5`
+        self._pos = end
+        return (value,)
+
+    def _expect(self, char: str, final: bool) -> Optional[bool]:
+        found = self._skip()
+        if found is None:
+            if final:
+                raise ValueError(f"expected {char!r}, got end of input")
+            return None
+        if found != char:
+            raise ValueError(f"expected {char!r} at offset {self._pos}, got {found!r}")
+        self._pos += 1
+        return True
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        while True:
+            if self._state == "start":
+                if self._expect("{" if self.key is not None else "[", final) is None:
+                    return items
+                self._state = "keys" if self.key is not None else "items"
+
+            elif self._state == "keys":
+                start = self._pos
+                found = self._skip(self._WHITESPACE + ",")
+                if found is None:
+                    return items
+                if found == "}":
+                    raise KeyError(self.key)
+                decoded = self._decode_value(final)
+                if decoded is None or self._expect(":", final) is None:
+                    self._pos = start
+                    return items
+                if decoded[0] == self.key:
+                    if self._expect("[", final) is None:
+                        self._pos = start
+                        return items
+                    self._state = "items"
+                else:
+                    self._skip()
+                    if self._decode_value(final) is None:  # skip other fields
+                        self._pos = start
+                        return items
+
+            elif self._state == "items":
+                found = self._skip(self._WHITESPACE + ",")
+                if found is None:
+                    return items
+                if found == "]":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return items
+                items.append(decoded[0])
+
+            else:  # done: ignore whatever follows the array
+                self._pos = len(self._buf)
+                return items
+
+
+def iter_json_array(chunks, key: Optional[str] = "users") -> Iterator:
+    """Yield array elements from an iterable of byte chunks"""
+    parser = JSONArrayStream(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+# ============================================================================
+# LOCAL STAND-IN SERVER (so examples run without the internet)
+# ============================================================================
+
+class _MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive needs HTTP/1.1 + Content-Length
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass  # keep example output clean
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: str):
+        """Stream a (large) JSON fixture from disk without loading it"""
+        api = self.server.api
+        encoding = choose_encoding(self.headers.get("Accept-Encoding"))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding is None:
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, 1 << 16)
+            api.bytes_sent += os.path.getsize(path)
+            return
+
+        # Compress on the fly -> size unknown up front -> chunked encoding
+        self.send_header("Content-Encoding", encoding)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        compressor = CODECS[encoding].compressor()
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(1 << 16)
+                data = compressor.compress(block) if block else compressor.flush()
+                if data:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    api.bytes_sent += len(data)
+                if not block:
+                    break
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_cacheable_json(self, payload):
+        """200 with ETag/Last-Modified, or 304 if the client's copy is current"""
+        api = self.server.api
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        last_modified = formatdate(api.last_modified, usegmt=True)
+
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(",")]
+        elif if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+                not_modified = int(api.last_modified) <= since
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
+            self.end_headers()
+            return
+        encoding = choose_encoding(self.headers.get("Accept-Encoding"))
+        if encoding is not None:
+            body = CODECS[encoding].compress(body)
+            self.send_header("Content-Encoding", encoding)
+        api.bytes_sent += len(body)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        encoding = self.headers.get("Content-Encoding")
+        if body and encoding in CODECS:
+            body = CODECS[encoding].decompress(body)
+        return json.loads(body or b"{}")
+
+    def do_GET(self):
+        api = self.server.api
+        api.simulate_latency()
+        if api.take_failure():
+            self._send_json(503, {"error": "unavailable"})
+            return
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        query = parse_qs(url.query)
+        with api.lock:
+            api.requests_served += 1
+        if url.path.strip("/") in api.files:
+            self._send_file(api.files[url.path.strip("/")])
+        elif parts == ["users"] and "ids" in query:
+            # Bulk endpoint: users?ids=1,2,3 -> only the users that exist
+            ids = [int(i) for i in query["ids"][0].split(",") if i.isdigit()]
+            self._send_cacheable_json({"users": [api.users[i] for i in ids if i in api.users]})
+        elif parts == ["users"]:
+            self._send_cacheable_json({"users": list(api.users.values())})
+        elif len(parts) == 2 and parts[0] == "users" and parts[1].isdigit():
+            user = api.users.get(int(parts[1]))
+            if user is None:
+                self._send_json(404, {"error": "not found"})
+            else:
+                self._send_cacheable_json(user)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        api = self.server.api
+        if self.path.strip("/") != "users":
+            self._send_json(404, {"error": "not found"})
+            return
+        with api.lock:
+            new_id = max(api.users, default=0) + 1
+            api.users[new_id] = {"id": new_id, **self._read_json()}
+            api.last_modified = time.time()
+        self._send_json(201, {"success": True, "id": new_id})
+
+    def do_DELETE(self):
+        api = self.server.api
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "users" and parts[1].isdigit():
+            with api.lock:
+                removed = api.users.pop(int(parts[1]), None)
+                api.last_modified = time.time()
+            if removed is not None:
+                self._send_json(200, {"success": True})
+                return
+        self._send_json(404, {"error": "not found"})
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # default backlog of 5 drops concurrent connects
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+        # clients hanging up (cancelled hedges, closed pools) are expected
+
+
+class MockAPIServer:
+    """
+    In-process HTTP server on a random local port
+    Usage:
+        with MockAPIServer() as server:
+            client = APIClient(server.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency=0.0):
+        self.latency = latency  # seconds added to every GET (or a callable returning them)
+        self.last_modified = time.time()
+        self.requests_served = 0  # GETs handled, for asserting upstream hits
+        self.bytes_sent = 0       # body bytes sent by cacheable GETs
+        self.files: dict[str, str] = {}  # endpoint -> JSON file served as-is
+        self.fail_next = 0        # answer the next N GETs with 503
+        self.failure_rate = 0.0   # ...and this fraction of the rest (1.0 = host is down)
+        self.users: dict[int, dict] = {
+            1: {"id": 1, "name": "Alice"},
+            2: {"id": 2, "name": "Bob"},
+        }
+        self.lock = threading.Lock()
+        self.httpd = _MockHTTPServer((host, port), _MockAPIHandler)
+        self.httpd.api = self
+        self._thread: Optional[threading.Thread] = None
+
+    def take_failure(self) -> bool:
+        with self.lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return True
+            return random.random() < self.failure_rate
+
+    def simulate_latency(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAPIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# BENCHMARK: pooled session vs. new connection per call
+# ============================================================================
+
+def benchmark_pooling(n_requests: int = 500, repeats: int = 5):
+    """Requests/sec with keep-alive pooling vs. requests.get() per call (median of repeats)"""
+    def rate(fn) -> float:
+        fn()  # untimed warm-up: imports, first connect, server threads
+        rates = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(n_requests):
+                fn()
+            rates.append(n_requests / (time.perf_counter() - start))
+        return sorted(rates)[len(rates) // 2]
+
+    with MockAPIServer() as server:
+        url = f"{server.base_url}/users/1"
+        unpooled = rate(lambda: requests.get(url).json())  # new TCP connection every time
+        client = APIClient(server.base_url)
+        pooled = rate(lambda: client.get("users/1"))
+        close_transports()
+
+    print(f"=== Benchmark: connection pooling (median of {repeats} x {n_requests}) ===")
+    print(f"  no pooling : {unpooled:8.0f} req/s")
+    print(f"  pooled     : {pooled:8.0f} req/s  ({pooled / unpooled:.1f}x)")
+
+
+def benchmark_async_client(n_requests: int = 1000, latency: float = 0.005,
+                           concurrency: int = 50):
+    """Sync client (sequential and threaded) vs. AsyncAPIClient with gather()"""
+    with MockAPIServer(latency=latency) as server:
+        client = APIClient(server.base_url, pool_size=concurrency)
+        endpoints = [f"users/{1 + i % 2}" for i in range(n_requests)]
+
+        start = time.perf_counter()
+        for endpoint in endpoints[: n_requests // 10]:
+            client.get(endpoint)
+        sequential = (n_requests // 10) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(client.get, endpoints))
+        threaded = n_requests / (time.perf_counter() - start)
+
+        async def run_async() -> float:
+            async with AsyncAPIClient(server.base_url, max_concurrency=concurrency) as aclient:
+                start = time.perf_counter()
+                responses = await asyncio.gather(*(aclient.get(e) for e in endpoints))
+                elapsed = time.perf_counter() - start
+                assert all(r.is_success() for r in responses)
+                assert aclient.pool.connections_opened <= concurrency
+                return n_requests / elapsed
+
+        async_rate = asyncio.run(run_async())
+        close_transports()
+
+    print(f"=== Benchmark: sync vs. async client ({latency * 1000:.0f} ms server latency) ===")
+    print(f"  sync, sequential       : {sequential:8.0f} req/s")
+    print(f"  sync, {concurrency} threads       : {threaded:8.0f} req/s")
+    print(f"  async, {concurrency} connections  : {async_rate:8.0f} req/s")
+
+
+def benchmark_cache(n_requests: int = 500, n_users: int = 200):
+    """Repeat reads of `users`: no cache vs. fresh hits vs. 304 revalidation"""
+    with MockAPIServer() as server:
+        server.users = {i: {"id": i, "name": f"User{i}"} for i in range(1, n_users + 1)}
+        rows = []
+        for label, cache in [
+            ("no cache", None),
+            ("cache, ttl=60s", ResponseCache(ttl=60)),
+            ("cache, ttl=0 (304s)", ResponseCache(ttl=0)),
+        ]:
+            client = APIClient(server.base_url, cache=cache)
+            server.requests_served = server.bytes_sent = 0
+            start = time.perf_counter()
+            for _ in range(n_requests):
+                assert client.get("users").is_success()
+            rate = n_requests / (time.perf_counter() - start)
+            rows.append((label, rate, server.requests_served, server.bytes_sent))
+        close_transports()
+
+    print("=== Benchmark: response cache ===")
+    for label, rate, upstream, sent in rows:
+        print(f"  {label:20}: {rate:8.0f} req/s  upstream={upstream:4}  body bytes={sent:9,}")
+
+
+def write_users_fixture(path: str, n_users: int):
+    """Write {"users": [...]} with n_users records, one at a time"""
+    with open(path, "w") as f:
+        f.write('{"total": %d, "users": [' % n_users)
+        for i in range(1, n_users + 1):
+            if i > 1:
+                f.write(",")
+            json.dump({"id": i, "name": f"User{i}", "email": f"user{i}@example.com",
+                       "bio": "x" * 100}, f)
+        f.write("]}")
+
+
+def _peak_rss_child(mode: str, base_url: str) -> tuple[int, int]:
+    """Run in a fresh process: read the fixture one way, return (records, peak RSS growth bytes)"""
+    import resource
+
+    def rss(field: str) -> int:
+        # VmRSS = current, VmHWM = peak. Both start fresh at exec, while on
+        # Linux ru_maxrss survives fork+exec and would report the parent's peak
+        try:
+            with open("/proc/self/status") as fp:
+                for line in fp:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1]) * 1024
+        except OSError:  # no /proc (macOS): peak RSS, which starts fresh there
+            pass
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    before = rss("VmRSS")
+    client = APIClient(base_url)
+    if mode == "full":
+        response = client.get("big/users")
+        count = len(response.data["users"])
+    elif mode == "stream":
+        count = sum(1 for _ in client.stream("big/users"))
+    else:
+        async def consume() -> int:
+            async with AsyncAPIClient(base_url) as aclient:
+                return sum([1 async for _ in aclient.stream("big/users")])
+        count = asyncio.run(consume())
+    return count, rss("VmHWM") - before
+
+
+def benchmark_streaming(n_users: int = 500_000):
+    """Peak RSS growth + time: get() (full body) vs. stream() vs. async stream()"""
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp, MockAPIServer() as server:
+        fixture = os.path.join(tmp, "users.json")
+        write_users_fixture(fixture, n_users)
+        server.files["big/users"] = fixture
+        size_mb = os.path.getsize(fixture) / 1e6
+
+        print(f"=== Benchmark: streaming decode ({n_users:,} users, {size_mb:.0f} MB) ===")
+        for mode in ("full", "stream", "async-stream"):
+            # an executor raises BrokenProcessPool if the child dies; Pool.apply would hang
+            with ProcessPoolExecutor(1, mp_context=ctx) as executor:
+                start = time.perf_counter()
+                count, peak = executor.submit(_peak_rss_child, mode, server.base_url).result()
+                elapsed = time.perf_counter() - start
+            assert count == n_users
+            print(f"  {mode:13}: peak RSS +{peak / 1e6:7.1f} MB  {elapsed:6.2f}s")
+
+
+def benchmark_compression(n_users: int = 100_000):
+    """Bytes on the wire + CPU per codec, decoded by streaming into JSONArrayStream"""
+    with tempfile.TemporaryDirectory() as tmp, MockAPIServer() as server:
+        fixture = os.path.join(tmp, "users.json")
+        write_users_fixture(fixture, n_users)
+        server.files["big/users"] = fixture
+        with open(fixture, "rb") as f:
+            raw = f.read()
+
+        print(f"=== Benchmark: compression ({n_users:,} users, {len(raw) / 1e6:.1f} MB JSON) ===")
+        print(f"  {'codec':8} {'on wire':>10} {'ratio':>6} {'compress':>9} {'decode':>8} {'end-to-end':>11}")
+        for name in ["identity", *CODECS]:
+            start = time.process_time()
+            compressed = raw if name == "identity" else CODECS[name].compress(raw)
+            compress_cpu = time.process_time() - start
+
+            # Client CPU: decompress 64 KiB network chunks straight into the parser
+            wire_chunks = [compressed[i:i + 65536] for i in range(0, len(compressed), 65536)]
+            decompressor = None if name == "identity" else CODECS[name].decompressor()
+            parser = JSONArrayStream("users")
+            start = time.process_time()
+            count = 0
+            for chunk in wire_chunks:
+                count += len(parser.feed(decompressor.decompress(chunk) if decompressor else chunk))
+            if decompressor:
+                count += len(parser.feed(decompressor.flush()))
+            count += len(parser.close())
+            decode_cpu = time.process_time() - start
+            assert count == n_users
+
+            async def fetch() -> int:
+                async with AsyncAPIClient(server.base_url, compression=False) as client:
+                    client.headers["Accept-Encoding"] = name
+                    return sum([1 async for _ in client.stream("big/users")])
+
+            server.bytes_sent = 0
+            start = time.perf_counter()
+            assert asyncio.run(fetch()) == n_users
+            elapsed = time.perf_counter() - start
+            print(f"  {name:8} {server.bytes_sent / 1e6:8.1f}MB {len(raw) / server.bytes_sent:5.1f}x "
+                  f"{compress_cpu * 1000:7.0f}ms {decode_cpu * 1000:6.0f}ms {elapsed * 1000:9.0f}ms")
+
+
 # ============================================================================
 # USAGE EXAMPLE
 # ============================================================================
 
-if __name__ == "__main__":
+def run_examples(server: "MockAPIServer"):
+    base_url = server.base_url
     # Create client (like URLSession())
-    client = APIClient("https://api.example.com")
+    client = APIClient(base_url)
     
     # Make request (like dataTask in Swift)
     response = client.get("users")
@@ -98,6 +1940,112 @@ if __name__ == "__main__":
     
     if response.is_success():
         print(f"\n✅ User created: {response.data}")
+    
+    # Opt-in cache (like URLCache): repeat reads skip the network
+    cached_client = APIClient(base_url, cache=ResponseCache(ttl=30))
+    for _ in range(3):
+        cached_client.get("users")
+    print(f"✅ Cache stats: {cached_client.cache_stats}")
+    
+    # Retries: two 503s, then success - the caller only sees the success
+    client_with_retry = APIClient(base_url, retry=RetryPolicy(max_attempts=4, base_delay=0.05))
+    server.fail_next = 2
+    response = client_with_retry.get("users/1")
+    print(f"✅ After retries: {response.data}  stats={client_with_retry.retry_stats}")
+    
+    # Streaming: records one at a time instead of one giant dict
+    names = [user["name"] for user in client.stream("users")]
+    print(f"✅ Streamed users: {names}")
+
+
+def example_resilience(server: "MockAPIServer"):
+    """Rate limiter (threads + asyncio) and circuit breaker vs. a flaky server"""
+    # Rate limit: 20 calls at 100/s with a burst of 5 -> >= 0.15s, threads or not
+    limiter = RateLimiter(rate=100, burst=5)
+    client = APIClient(server.base_url, rate_limiter=limiter)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: client.get("users/1"), range(20)))
+    threaded = time.perf_counter() - start
+
+    async def limited_async() -> float:
+        async with AsyncAPIClient(server.base_url, rate_limiter=RateLimiter(100, 5),
+                                  coalesce=False) as aclient:
+            start = time.perf_counter()
+            await asyncio.gather(*(aclient.get("users/1") for _ in range(20)))
+            return time.perf_counter() - start
+
+    in_async = asyncio.run(limited_async())
+    assert threaded >= 0.14 and in_async >= 0.14  # 15 tokens past the burst at 100/s
+    print(f"\n✅ Rate limited 20 calls @100/s: threads {threaded:.2f}s, asyncio {in_async:.2f}s")
+
+    # Circuit breaker: host goes down -> open -> fail fast -> half-open -> closed
+    breaker = CircuitBreaker(server.base_url, failure_threshold=3, reset_timeout=0.2,
+                             on_state_change=lambda old, new: print(f"   breaker: {old} -> {new}"))
+    client = APIClient(server.base_url, breaker=breaker)
+    server.failure_rate = 1.0
+    for _ in range(3):
+        client.get("users/1")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    served_before = server.requests_served
+    response = client.get("users/1")
+    assert server.requests_served == served_before  # failed fast, never sent
+    print(f"   while open: {response.error!r}")
+
+    server.failure_rate = 0.0
+    time.sleep(0.25)
+    assert client.get("users/1").is_success() and breaker.state == CircuitBreaker.CLOSED
+    print(f"✅ Breaker transitions: {[(old, new) for _, old, new in breaker.transitions]}")
+
+
+async def run_async_examples(base_url: str):
+    # Same API, but awaitable (like Swift's async URLSession methods)
+    async with AsyncAPIClient(base_url, max_concurrency=10) as client:
+        responses = await asyncio.gather(client.get("users/1"), client.get("users/2"))
+        print(f"\n✅ Async users: {[r.data for r in responses]}")
+
+        response = await client.delete("users/3")
+        print(f"✅ Async delete: {response.data}")
+
+    # gzip'd request body, compressed response (Accept-Encoding: zstd, br, gzip)
+    async with AsyncAPIClient(base_url, compress_requests="gzip") as client:
+        created = await client.post("users", {"name": "Dana", "email": "dana@example.com"})
+        users = await client.get("users")
+        print(f"✅ Compressed POST/GET: {created.data}, {len(users.data['users'])} users")
+
+
+async def example_single_flight(base_url: str, n_callers: int = 100):
+    """N identical concurrent GETs -> exactly one upstream request"""
+    async with AsyncAPIClient(base_url) as client:
+        responses = await asyncio.gather(*(client.get("users/1") for _ in range(n_callers)))
+    assert all(r is responses[0] for r in responses)  # everyone shares one APIResponse
+    print(f"✅ Single-flight: {n_callers} callers, {client.single_flight.calls} upstream call")
+
+
+if __name__ == "__main__":
+    # Local stand-in for https://api.example.com
+    with MockAPIServer() as server:
+        run_examples(server)
+        example_resilience(server)
+        asyncio.run(run_async_examples(server.base_url))
+
+        server.latency = 0.05  # keep the request in flight while callers pile up
+        asyncio.run(example_single_flight(server.base_url))  # tests/test_single_flight.py
+        server.latency = 0.0
+        close_transports()
+
+    if "--bench" in sys.argv:
+        print()
+        benchmark_pooling()
+        print()
+        benchmark_async_client()
+        print()
+        benchmark_cache()
+        print()
+        benchmark_streaming()
+        print()
+        benchmark_compression()
 
 
 # ============================================================================
@@ -5,7 +5,54 @@ Swift → Python async/await translation
 """
 
 import asyncio
-from typing import Optional
+import importlib.util
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from collections import deque
+from itertools import count, islice, takewhile
+from typing import (Any, AsyncIterator, Awaitable, Callable, Coroutine, Hashable, Iterable,
+                    Iterator, NamedTuple, Optional)
+
+
+try:
+    import uvloop  # pip3 install uvloop (optional, faster event loop; not on Windows)
+
+    HAS_UVLOOP = True
+
+except ImportError:
+    HAS_UVLOOP = False
+
+
+def load_exercise(filename: str):
+    """
+    Import a sibling exercise file
+    `import 02_exercise_api_client` is a syntax error (names can't start with a
+    digit), so load it by path - used for the real HTTP client and mock server.
+    """
+    path = Path(__file__).with_name(filename)
+    name = path.stem.lstrip("0123456789_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Deadlines live next to the HTTP clients so APIClient / AsyncAPIClient and
+# the coroutines below all honour the same budget
+_api = load_exercise("02_exercise_api_client.py")
+Deadline, DeadlineExceeded, time_budget = _api.Deadline, _api.DeadlineExceeded, _api.time_budget
+shared_context, await_shared = _api.shared_context, _api.await_shared
 
 
 # ============================================================================
@@ -21,6 +68,7 @@ from typing import Optional
 # Python:
 async def fetch_data(delay: float = 1) -> str:
     """Simulate async network call"""
+    time_budget()  # don't start if the caller's Deadline has already passed
     print("🔄 Fetching data...")
     await asyncio.sleep(delay)  # Simulate network delay
     print("✅ Data fetched!")
@@ -50,6 +98,7 @@ async def main():
 
 async def fetch_user(user_id: int) -> dict:
     """Fetch a single user"""
+    time_budget()  # fail fast once the Deadline is gone
     await asyncio.sleep(1)  # Simulate API call
     return {"id": user_id, "name": f"User{user_id}"}
 
@@ -67,29 +116,631 @@ async def fetch_all_users(user_ids: list[int]) -> list[dict]:
     return results
 
 
+# ============================================================================
+# STREAMING FAN-OUT (TaskGroup + as_completed)
+# ============================================================================
+
+# fetch_all_users() creates every coroutine up front and gathers them: with
+# 1M ids that's 1M coroutines + tasks alive at once, nothing comes back
+# until the slowest call finishes, and one exception fails the whole call.
+# fan_out() is the `for try await result in group` loop of a Swift TaskGroup:
+#   - at most max_in_flight tasks exist; a new one starts as each finishes,
+#     pulling ids lazily from any iterable (range(1_000_000) stays a range)
+#   - results are yielded as they land (completion order, not input order)
+#   - a failed call becomes an Outcome with .error; the rest keep going
+#   - breaking out of the loop / cancelling the consumer cancels whatever
+#     is still in flight (use contextlib.aclosing to make it immediate)
+
+class Outcome(NamedTuple):
+    item: Any
+    result: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(fn: Callable[[Any], Awaitable], items: Iterable, max_in_flight: int = 100,
+                  limiter: Optional["AdaptiveLimiter"] = None) -> AsyncIterator[Outcome]:
+    """
+    Run fn(item) for every item, at most max_in_flight at a time; yield Outcomes as they complete
+    limiter: an AdaptiveLimiter further caps how many calls actually run
+    """
+    finished: asyncio.Queue[Outcome] = asyncio.Queue()
+    running: set[asyncio.Task] = set()
+    items = iter(items)
+
+    async def run(item):
+        try:
+            if limiter is None:
+                result = await fn(item)
+            else:
+                result = await limiter.call(lambda: fn(item))
+            outcome = Outcome(item, result=result)
+        except Exception as e:  # partial failure: report it, don't cancel siblings
+            outcome = Outcome(item, error=e)
+        finished.put_nowait(outcome)
+
+    pending = 0
+    async with asyncio.TaskGroup() as group:
+        def start(item):
+            nonlocal pending
+            task = group.create_task(run(item))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            pending += 1
+
+        for item in islice(items, max_in_flight):
+            start(item)
+        while pending:
+            outcome = await finished.get()
+            pending -= 1
+            for item in islice(items, 1):  # refill the window before handing out the result
+                start(item)
+            try:
+                yield outcome
+            except GeneratorExit:
+                # Consumer stopped early. Cancel the window ourselves and leave the
+                # group normally - letting GeneratorExit reach TaskGroup.__aexit__
+                # would turn it into a BaseExceptionGroup.
+                for task in running:
+                    task.cancel()
+                break
+
+
+def stream_users(user_ids: Iterable[int], max_in_flight: int = 100,
+                 limiter: Optional["AdaptiveLimiter"] = None) -> AsyncIterator[Outcome]:
+    """fetch_all_users, streamed: Outcome(user_id, user dict | None, error | None)"""
+    return fan_out(fetch_user, user_ids, max_in_flight, limiter)
+
+
+# ============================================================================
+# ADAPTIVE CONCURRENCY (AIMD)
+# ============================================================================
+
+# A fixed max_in_flight is a guess: too low wastes a fast upstream, too high
+# turns a slow one into a queue (latency climbs until calls time out). Like
+# TCP congestion control - and Netflix's concurrency-limits library -
+# AdaptiveLimiter finds the limit from what responses look like:
+#   - additive increase: each healthy response while the limit is actually in
+#     use (in_flight >= limit / 2) adds 1
+#   - multiplicative decrease: an error, or latency above tolerance x the best
+#     latency seen recently, multiplies the limit by backoff_ratio - at most
+#     once per window, since the calls already in flight were started under
+#     the old limit and will look slow too
+# The best-latency baseline drifts up slowly so a permanently slower
+# upstream eventually becomes the new normal.
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit; `await limiter.call(make_call)` waits for a slot"""
+
+    def __init__(self, initial_limit: int = 10, min_limit: int = 1, max_limit: int = 500,
+                 backoff_ratio: float = 0.9, tolerance: float = 1.5, drift: float = 0.0001):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.drift = drift  # per-sample growth of the latency baseline
+        self.in_flight = 0
+        self.min_latency = float("inf")
+        self.decreases = 0
+        self._cooldown = 0  # samples to ignore after a decrease
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter  # _wake() counted us into in_flight before resolving
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1  # woken and cancelled in the same tick: pass the slot on
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: float, ok: bool):
+        self.in_flight -= 1
+        self._update(latency, ok)
+        self._wake()
+
+    def abandon(self):
+        """Give the slot back without a sample - the caller cancelled, upstream did nothing wrong"""
+        self.in_flight -= 1
+        self._wake()
+
+    async def call(self, make_call: Callable[[], Awaitable]):
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            result = await make_call()
+        except asyncio.CancelledError:  # fan_out closed early, Deadline expired, ...
+            self.abandon()
+            raise
+        except BaseException:
+            self.release(time.perf_counter() - start, ok=False)
+            raise
+        self.release(time.perf_counter() - start, ok=True)
+        return result
+
+    def _update(self, latency: float, ok: bool):
+        if ok:
+            self.min_latency = min(latency, self.min_latency * (1 + self.drift))
+        self._cooldown -= 1
+        if not ok or latency > self.tolerance * self.min_latency:
+            if self._cooldown <= 0:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._cooldown = int(self.limit)
+                self.decreases += 1
+        elif self.in_flight + 1 >= self.limit / 2:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+# ============================================================================
+# MULTI-CORE RUNNER (uvloop + one event loop per process)
+# ============================================================================
+
+# An event loop runs on one thread, so once each call costs real CPU (JSON
+# decoding, validation) a single process tops out at one core, however many
+# calls are "in flight". Two knobs:
+#   - run_async(): asyncio.run() on uvloop when installed (libuv-based loop,
+#     cheaper scheduling and socket I/O), the stock loop otherwise
+#   - run_sharded(): N worker processes, each with its own loop running
+#     fan_out(); the parent deals chunks of items out through a shared
+#     queue (whoever is free takes the next chunk) and streams the Outcomes
+#     back as they arrive
+# fn must be a module-level async function so it can be pickled.
+
+def run_async(main: Coroutine, use_uvloop: bool = True):
+    """asyncio.run(main), on a uvloop event loop when available"""
+    loop_factory = uvloop.new_event_loop if use_uvloop and HAS_UVLOOP else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)
+
+
+def _shard_worker(fn, tasks, results, max_in_flight: int, use_uvloop: bool):
+    """Worker process: take chunks until the None sentinel, send back one Outcome list per chunk"""
+    async def main():
+        loop = asyncio.get_running_loop()
+        while (chunk := await loop.run_in_executor(None, tasks.get)) is not None:
+            results.put([outcome async for outcome in fan_out(fn, chunk, max_in_flight)])
+
+    try:
+        run_async(main(), use_uvloop)
+    except BaseException as e:
+        results.put(RuntimeError(f"run_sharded worker {os.getpid()} crashed: {e!r}"))
+        raise
+    results.put(None)  # "this worker is done"
+
+
+def run_sharded(fn: Callable[[Any], Awaitable], items: Iterable, processes: Optional[int] = None,
+                max_in_flight: int = 100, chunk_size: int = 1000,
+                use_uvloop: bool = True) -> Iterator[Outcome]:
+    """
+    fan_out() across `processes` worker processes (default: one per core)
+    Yields Outcomes in completion order; stopping early terminates the workers.
+    """
+    processes = processes or os.cpu_count() or 1
+    ctx = multiprocessing.get_context("spawn")
+    tasks, results = ctx.Queue(maxsize=2 * processes), ctx.Queue()
+    workers = [
+        ctx.Process(target=_shard_worker, daemon=True,
+                    args=(fn, tasks, results, max_in_flight, use_uvloop))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    def check_alive():
+        if not any(w.is_alive() for w in workers):
+            raise RuntimeError("run_sharded: all workers exited")
+
+    def put(chunk):
+        while True:  # blocks while the queue is full: bounded memory
+            try:
+                return tasks.put(chunk, timeout=1.0)
+            except queue.Full:
+                check_alive()
+
+    def take(block: bool):
+        while True:
+            try:
+                batch = results.get(timeout=1.0) if block else results.get_nowait()
+            except queue.Empty:
+                if not block:
+                    return []
+                check_alive()
+                continue
+            if isinstance(batch, Exception):
+                raise batch
+            return batch
+
+    done = 0
+    try:
+        items = iter(items)
+        while chunk := list(islice(items, chunk_size)):
+            put(chunk)
+            while batch := take(block=False):
+                yield from batch
+        for _ in workers:
+            put(None)
+        while done < len(workers):
+            batch = take(block=True)
+            if batch is None:
+                done += 1
+            else:
+                yield from batch
+    finally:
+        for worker in workers:
+            if done < len(workers):
+                worker.terminate()
+            worker.join()
+
+
+# ============================================================================
+# REQUEST BATCHING (DataLoader pattern)
+# ============================================================================
+
+# fetch_all_users([1..10000]) above = 10,000 coroutines and 10,000 round trips.
+# A BatchLoader lets every caller keep writing `await loader.load(user_id)`,
+# but collects all keys requested in the same event-loop tick and sends them
+# as ONE bulk call (e.g. GET users?ids=1,2,3), then hands each caller its row.
+
+class BatchLoader:
+    """
+    Collect load(key) calls into batched calls to batch_fn(keys) -> {key: value}
+    max_batch_size -> a full batch is dispatched immediately
+    max_wait       -> seconds to keep collecting (0 = just this loop tick)
+    """
+
+    def __init__(self, batch_fn: Callable[[list], Awaitable[dict]],
+                 max_batch_size: int = 100, max_wait: float = 0.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches_sent = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.Handle] = None
+        self._batches: set[asyncio.Task] = set()  # the loop only keeps weak refs to tasks
+
+    def load(self, key: Hashable) -> Awaitable:
+        """
+        Awaitable value for key (duplicate keys in one batch share a slot)
+        Each caller waits through await_shared: its own Deadline applies, and
+        its timeout or cancellation doesn't cancel the others.
+        """
+        future = self._pending.get(key)
+        if future is not None:
+            return await_shared(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(self._retrieve)
+        self._pending[key] = future
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            if self.max_wait > 0:
+                self._timer = loop.call_later(self.max_wait, self._dispatch)
+            else:
+                self._timer = loop.call_soon(self._dispatch)
+        return await_shared(future)
+
+    async def load_many(self, keys: list) -> list:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    @staticmethod
+    def _retrieve(future: asyncio.Future):
+        # If every waiter was cancelled, nobody reads a failed batch's
+        # exception and asyncio logs "exception was never retrieved".
+        if not future.cancelled():
+            future.exception()
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self.batches_sent += 1
+        # the batch belongs to every caller in it, not to the one whose
+        # load() scheduled this dispatch: run it without that caller's Deadline
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch), context=shared_context())
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: dict[Hashable, asyncio.Future]):
+        try:
+            results = await self.batch_fn(list(batch))
+        except BaseException as e:
+            for future in batch.values():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in batch.items():
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
+
+
+async def fetch_users_bulk(user_ids: list[int]) -> dict[int, dict]:
+    """Simulated bulk endpoint: one round trip for any number of IDs"""
+    await asyncio.sleep(1)
+    return {uid: {"id": uid, "name": f"User{uid}"} for uid in user_ids}
+
+
+async def fetch_all_users_batched(user_ids: list[int], max_batch_size: int = 100) -> list[dict]:
+    """Same result as fetch_all_users, but ~len(user_ids) / max_batch_size round trips"""
+    loader = BatchLoader(fetch_users_bulk, max_batch_size=max_batch_size)
+    return await loader.load_many(user_ids)
+
+
+def http_user_loader(client, max_batch_size: int = 100, max_wait: float = 0.0) -> BatchLoader:
+    """BatchLoader backed by AsyncAPIClient and the users?ids=... bulk endpoint"""
+
+    async def batch_fn(user_ids: list[int]) -> dict[int, dict]:
+        response = await client.get("users?ids=" + ",".join(map(str, user_ids)))
+        if not response.is_success():
+            raise RuntimeError(response.error)
+        return {user["id"]: user for user in response.data["users"]}
+
+    return BatchLoader(batch_fn, max_batch_size=max_batch_size, max_wait=max_wait)
+
+
+# ============================================================================
+# HEDGED REQUESTS (cutting tail latency)
+# ============================================================================
+
+# A timeout only decides when to give up. Hedging decides when to stop
+# waiting alone: if a call hasn't finished by (say) the p95 of recent
+# latencies, send a second identical call and take whichever finishes first,
+# cancelling the other. A slow straggler now costs ~p95 + one normal call
+# instead of its full latency, for ~5% extra requests. Only hedge idempotent
+# calls (GETs) - the duplicate really does hit the server.
+# AsyncAPIClient.get(endpoint, hedge=policy) sends the duplicates past the
+# client's single-flight coalescing, so they really go out.
+
+class HedgePolicy:
+    """
+    Hedge delay = `percentile` of the last `window` observed latencies
+    Until `min_samples` latencies are in, `initial_delay` is used.
+    """
+
+    def __init__(self, percentile: float = 0.95, initial_delay: float = 0.05,
+                 min_delay: float = 0.001, max_hedges: int = 1,
+                 window: int = 1000, min_samples: int = 20):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self.latencies: deque[float] = deque(maxlen=window)
+        self._cached_delay: Optional[float] = None
+        self._recorded = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0  # the duplicate finished first
+
+    def delay(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+        if self._cached_delay is None:  # re-sorted every min_samples records, not per call
+            ordered = sorted(self.latencies)
+            self._cached_delay = max(self.min_delay, ordered[int(self.percentile * (len(ordered) - 1))])
+        return self._cached_delay
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+        self._recorded += 1
+        if self._recorded % self.min_samples == 0:
+            self._cached_delay = None
+
+    async def run(self, make_call: Callable[[], Awaitable]):
+        """hedged(make_call, self) - what AsyncAPIClient.get(endpoint, hedge=policy) calls"""
+        return await hedged(make_call, self)
+
+
+async def hedged(make_call: Callable[[], Awaitable], policy: HedgePolicy):
+    """
+    Run make_call(); start up to max_hedges duplicates while it's slow
+    Returns the first successful result; raises only if every attempt failed.
+    make_call must raise on failure and must not coalesce - for HTTP use
+    client.get(endpoint, hedge=policy), not hedged(lambda: client.get(...)).
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = [asyncio.ensure_future(make_call())]
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            can_hedge = len(tasks) <= policy.max_hedges
+            pending = [t for t in tasks if not t.done()]
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=policy.delay() if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    policy.record(loop.time() - start)
+                    if task is not tasks[0]:
+                        policy.hedges_won += 1
+                    return task.result()
+                error = task.exception()
+            if not done or (can_hedge and not any(not t.done() for t in tasks)):
+                # Too slow (or the only attempt failed): fire a duplicate
+                if not can_hedge:
+                    raise error
+                policy.hedges_sent += 1
+                tasks.append(asyncio.ensure_future(make_call()))
+            elif all(t.done() for t in tasks):
+                raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
 # ============================================================================
 # TIMEOUT HANDLING
 # ============================================================================
 
-async def fetch_with_timeout(delay: float = 5, timeout: float = 2) -> Optional[str]:
+async def fetch_with_timeout(delay: float = 5, timeout: float = 2,
+                             retry=None) -> Optional[str]:
     """
     Fetch with timeout
     Swift: try? await withThrowingTaskGroup
+    
+    retry: a RetryPolicy from 02_exercise_api_client.py - each attempt gets its
+    own `timeout`, timed-out attempts are retried with backoff + jitter.
+    Inside a Deadline every attempt's timeout is shortened to the time left.
     """
+    def attempt():
+        return asyncio.wait_for(fetch_data(delay), timeout=time_budget(timeout))
+    
     try:
-        result = await asyncio.wait_for(
-            fetch_data(delay),
-            timeout=timeout
-        )
-        return result
+        if retry is None:
+            return await attempt()
+        return await retry.acall("GET", attempt)
     except asyncio.TimeoutError:
         return None
 
 
+# ============================================================================
+# NETWORK SESSION (like URLSession with a configured lifecycle)
+# ============================================================================
+
+class NetworkSession:
+    """
+    An AsyncAPIClient with a lifecycle: warm on enter, drain on exit
+    Swift: let session = URLSession(configuration: .default) ... session.finishTasksAndInvalidate()
+    
+    async with NetworkSession(base_url, warm_connections=8) as session:
+        data = await session.fetch("users/1")
+    
+    Enter resolves the host once (connections then skip DNS and try the
+    addresses in order) and opens warm_connections keep-alive sockets
+    concurrently, so the first burst of requests doesn't queue behind
+    connects. Exit stops accepting new fetches, waits up to drain_timeout for
+    the in-flight ones (retry backoffs included) and closes the pool; a fetch
+    still running after that can't open a new connection.
+    """
+
+    def __init__(self, base_url: str, warm_connections: int = 4, drain_timeout: float = 5.0,
+                 **client_options):
+        self.client = _api.AsyncAPIClient(base_url, **client_options)
+        self.warm_connections = warm_connections
+        self.drain_timeout = drain_timeout
+        self.closing = False
+        self.drained = True  # False if exit gave up on in-flight requests
+        self.warm_up_error: Optional[OSError] = None
+
+    async def __aenter__(self) -> "NetworkSession":
+        pool = self.client.pool
+        try:
+            await pool.resolve()
+        except OSError:
+            pass  # resolve per connection instead; the first fetch reports the real error
+        if self.warm_connections:
+            try:
+                await pool.warm_up(self.warm_connections)
+            except OSError as e:
+                # No resolved address answered (or the server isn't up yet):
+                # drop the pin, fetches connect through DNS on demand
+                self.warm_up_error = e
+                pool.addresses = []
+        return self
+
+    async def fetch(self, endpoint: str) -> Any:
+        """GET endpoint and return the decoded body (ConnectionError on failure)"""
+        if self.closing:
+            raise RuntimeError("NetworkSession is closing")
+        response = await self.client.get(endpoint)
+        if not response.is_success():
+            raise ConnectionError(response.error)
+        return response.data
+
+    async def __aexit__(self, *exc):
+        self.closing = True
+        self.drained = await self.client.drain(self.drain_timeout)
+        await self.client.aclose()
+
+
 # ============================================================================
 # RUNNING EXAMPLES
 # ============================================================================
 
+async def example_deadlines():
+    """No work outlives its deadline (the same cases are checked in tests/test_deadlines.py)"""
+    # 1. async with: the whole fan-out is cancelled at the deadline
+    start = time.perf_counter()
+    try:
+        async with Deadline(0.3):
+            await fetch_all_users([1, 2, 3])  # 1 s each
+    except DeadlineExceeded as e:
+        print(f"  fetch_all_users under Deadline(0.3): {e!r} after {time.perf_counter() - start:.2f}s")
+    
+    # 2. inner timeouts are shortened to the time left (5 s -> 0.3 s)
+    start = time.perf_counter()
+    with Deadline(0.3):
+        result = await fetch_with_timeout(delay=1, timeout=5)
+    print(f"  fetch_with_timeout(timeout=5) under Deadline(0.3): {result} "
+          f"after {time.perf_counter() - start:.2f}s")
+    
+    # 3. once expired, new work fails before it starts
+    with Deadline(0.05):
+        await asyncio.sleep(0.06)
+        try:
+            await fetch_user(1)
+        except DeadlineExceeded:
+            print("  fetch_user after expiry: DeadlineExceeded without starting")
+    
+    # 4. HTTP clients: 1 s server, 10 s client timeout, retries - all capped by 0.3 s
+    with _api.MockAPIServer(latency=1.0) as server:
+        client = _api.APIClient(server.base_url, retry=_api.RetryPolicy(max_attempts=5))
+        start = time.perf_counter()
+        with Deadline(0.3):
+            response = await asyncio.to_thread(client.get, "users/1")  # to_thread copies the context
+        print(f"  APIClient.get under Deadline(0.3): {response.error!r} "
+              f"after {time.perf_counter() - start:.2f}s")
+        
+        async with _api.AsyncAPIClient(server.base_url, retry=_api.RetryPolicy(max_attempts=5)) as aclient:
+            start = time.perf_counter()
+            try:
+                async with Deadline(0.3):
+                    await aclient.get("users/1")
+            except DeadlineExceeded:
+                pass
+            print(f"  AsyncAPIClient.get under Deadline(0.3): gave up after "
+                  f"{time.perf_counter() - start:.2f}s")
+            
+            start = time.perf_counter()
+            try:
+                with Deadline(0.3):
+                    [user async for user in aclient.stream("users")]
+            except TimeoutError as e:  # DeadlineExceeded is a TimeoutError too
+                print(f"  AsyncAPIClient.stream under Deadline(0.3): {e!r} after "
+                      f"{time.perf_counter() - start:.2f}s")
+
+
 async def run_examples():
     print("=== Example 1: Simple Async ===")
     result = await fetch_data(delay=1)
@@ -107,6 +758,342 @@ async def run_examples():
     
     result = await fetch_with_timeout(delay=5, timeout=1)
     print(f"Result (timeout): {result}")
+    
+    api = load_exercise("02_exercise_api_client.py")
+    policy = api.RetryPolicy(max_attempts=3, base_delay=0.1)
+    result = await fetch_with_timeout(delay=1, timeout=0.2, retry=policy)
+    print(f"Result (3 attempts, all timed out): {result}  stats={policy.stats.snapshot()}")
+    print()
+    
+    print("=== Example 4: Batched Requests ===")
+    users = await fetch_all_users_batched(list(range(1, 1001)), max_batch_size=250)
+    print(f"  {len(users)} users in 4 bulk calls (~1s), first: {users[0]}")
+    print()
+    
+    print("=== Example 5: Hedged Request ===")
+    delays = iter([3, 0.5])  # first call is a straggler, the hedge is quick
+    policy = HedgePolicy(initial_delay=0.3)
+    start = time.perf_counter()
+    result = await hedged(lambda: fetch_data(next(delays)), policy)
+    print(f"Result: {result} in {time.perf_counter() - start:.1f}s (not 3s), "
+          f"hedges sent={policy.hedges_sent} won={policy.hedges_won}")
+    print()
+    
+    print("=== Example 6: Streaming Fan-out ===")
+    async def flaky_user(user_id: int) -> dict:
+        await asyncio.sleep(random.uniform(0.1, 0.5))
+        if user_id == 3:
+            raise ConnectionError("upstream reset")
+        return {"id": user_id, "name": f"User{user_id}"}
+    
+    start = time.perf_counter()
+    async for outcome in fan_out(flaky_user, range(1, 7), max_in_flight=3):
+        shown = outcome.result if outcome.ok else f"❌ {outcome.error!r}"
+        print(f"  +{time.perf_counter() - start:.2f}s user {outcome.item}: {shown}")
+    print()
+    
+    print("=== Example 7: Deadlines ===")
+    await example_deadlines()
+    print()
+    
+    print("=== Example 8: NetworkSession ===")
+    with _api.MockAPIServer(latency=0.2) as server:
+        base_url = server.base_url.replace("127.0.0.1", "localhost")
+        async with NetworkSession(base_url, warm_connections=4) as session:
+            pool = session.client.pool
+            print(f"  warmed: {pool.connections_opened} connections to {pool.address} "
+                  f"(resolved from {pool.host})")
+            data = await session.fetch("users/1")
+            print(f"  fetch('users/1') -> {data}")
+            late = asyncio.create_task(session.fetch("users/2"))
+            await asyncio.sleep(0.05)  # in flight when the block exits
+        print(f"  exit waited for the in-flight fetch: {late.done()} -> {late.result()}")
+        try:
+            await session.fetch("users/3")
+        except RuntimeError as e:
+            print(f"  fetch after exit: {e}")
+
+
+# ============================================================================
+# BENCHMARKS (python3 03_exercise_async.py --bench)
+# ============================================================================
+
+def benchmark_batching(n_ids: int = 10_000, max_batch_size: int = 100):
+    """One GET per user vs. BatchLoader bulk GETs against the local mock server"""
+    api = load_exercise("02_exercise_api_client.py")
+
+    async def per_id(client) -> list:
+        return await asyncio.gather(*(client.get(f"users/{uid}") for uid in range(1, n_ids + 1)))
+
+    async def batched(client) -> list:
+        loader = http_user_loader(client, max_batch_size=max_batch_size)
+        users = await loader.load_many(list(range(1, n_ids + 1)))
+        assert loader.batches_sent == -(-n_ids // max_batch_size)
+        return users
+
+    async def timed(server, fn) -> tuple[float, int]:
+        served_before = server.requests_served
+        async with api.AsyncAPIClient(server.base_url, max_concurrency=50) as client:
+            start = time.perf_counter()
+            results = await fn(client)
+            elapsed = time.perf_counter() - start
+        assert len(results) == n_ids
+        return elapsed, server.requests_served - served_before
+
+    with api.MockAPIServer() as server:
+        server.users = {i: {"id": i, "name": f"User{i}"} for i in range(1, n_ids + 1)}
+        per_id_time, per_id_calls = asyncio.run(timed(server, per_id))
+        batched_time, batched_calls = asyncio.run(timed(server, batched))
+
+    print(f"=== Benchmark: fetching {n_ids:,} users ===")
+    print(f"  one GET per id : {per_id_time:6.2f}s  upstream requests={per_id_calls:,}")
+    print(f"  BatchLoader    : {batched_time:6.2f}s  upstream requests={batched_calls:,}")
+
+
+def benchmark_hedging(n_requests: int = 2000, concurrency: int = 20):
+    """p50/p99 of GETs against a server with a heavy latency tail, with and without hedging"""
+    api = load_exercise("02_exercise_api_client.py")
+
+    def tail_latency() -> float:
+        return 0.1 if random.random() < 0.03 else random.uniform(0.001, 0.004)
+
+    async def run(base_url: str, policy: Optional[HedgePolicy]) -> list[float]:
+        latencies = []
+        window = asyncio.Semaphore(concurrency)
+        async with api.AsyncAPIClient(base_url, coalesce=False) as client:  # baseline uncoalesced too
+            async def one(i: int):
+                async with window:
+                    start = time.perf_counter()
+                    if policy is None:
+                        response = await client.get(f"users/{1 + i % 2}")
+                    else:
+                        response = await client.get(f"users/{1 + i % 2}", hedge=policy)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.is_success()
+            await asyncio.gather(*(one(i) for i in range(n_requests)))
+        return sorted(latencies)
+
+    def pct(values: list[float], p: float) -> float:
+        return values[int(p * (len(values) - 1))] * 1000
+
+    with api.MockAPIServer(latency=tail_latency) as server:
+        plain = asyncio.run(run(server.base_url, None))
+        served_before = server.requests_served
+        policy = HedgePolicy(percentile=0.95, initial_delay=0.01)
+        hedged_latencies = asyncio.run(run(server.base_url, policy))
+        extra = server.requests_served - served_before - n_requests
+
+    print(f"=== Benchmark: hedging ({n_requests:,} GETs, 3% take 100 ms) ===")
+    print(f"  no hedging : p50 {pct(plain, 0.5):6.1f} ms   p99 {pct(plain, 0.99):6.1f} ms")
+    print(f"  hedged p95 : p50 {pct(hedged_latencies, 0.5):6.1f} ms   "
+          f"p99 {pct(hedged_latencies, 0.99):6.1f} ms   "
+          f"extra requests {extra} ({extra / n_requests:.1%})")
+
+
+def _fan_out_rss_child(mode: str, n_ids: int) -> tuple[int, float, int]:
+    """Run in a fresh process: fetch n_ids fake users, return (count, seconds, peak RSS growth bytes)"""
+    import resource
+
+    def rss(field: str) -> int:
+        # VmRSS = current, VmHWM = peak. Both start fresh at exec, while on
+        # Linux ru_maxrss survives fork+exec and would report the parent's peak
+        try:
+            with open("/proc/self/status") as fp:
+                for line in fp:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1]) * 1024
+        except OSError:  # no /proc (macOS): peak RSS, which starts fresh there
+            pass
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    async def fake_fetch(user_id: int) -> dict:
+        await asyncio.sleep(0)
+        return {"id": user_id}
+
+    async def run() -> int:
+        if mode == "gather":
+            return len(await asyncio.gather(*(fake_fetch(uid) for uid in range(n_ids))))
+        return sum([1 async for o in fan_out(fake_fetch, range(n_ids), max_in_flight=1000) if o.ok])
+
+    before = rss("VmRSS")
+    start = time.perf_counter()
+    count = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return count, elapsed, rss("VmHWM") - before
+
+
+def benchmark_fan_out(n_ids: int = 1_000_000):
+    """Peak RSS growth + time for n_ids calls: gather everything vs. fan_out window of 1000"""
+    ctx = multiprocessing.get_context("spawn")
+    print(f"=== Benchmark: fan-out over {n_ids:,} ids ===")
+    for mode in ("gather", "fan_out"):
+        # an executor raises BrokenProcessPool if the child dies; Pool.apply would hang
+        with ProcessPoolExecutor(1, mp_context=ctx) as executor:
+            count, elapsed, peak = executor.submit(_fan_out_rss_child, mode, n_ids).result()
+        assert count == n_ids
+        print(f"  {mode:8}: peak RSS +{peak / 1e6:7.1f} MB  {elapsed:6.2f}s")
+
+
+class FiniteCapacity:
+    """
+    MockAPIServer latency model: `workers` requests are served at a time,
+    each takes service_time; the rest queue. Change .workers mid-run.
+    """
+
+    def __init__(self, workers: int, service_time: float):
+        self.service_time = service_time
+        self._workers = workers
+        self._busy = 0
+        self._cond = threading.Condition()
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @workers.setter
+    def workers(self, value: int):
+        with self._cond:
+            self._workers = value
+            self._cond.notify_all()
+
+    def __call__(self) -> float:
+        with self._cond:
+            while self._busy >= self._workers:
+                self._cond.wait()
+            self._busy += 1
+        time.sleep(self.service_time)
+        with self._cond:
+            self._busy -= 1
+            self._cond.notify()
+        return 0.0  # already slept
+
+
+_USER_PAYLOAD = json.dumps({"users": [{"id": i, "name": f"User{i}", "tags": ["a", "b"]}
+                                      for i in range(20)]})
+
+
+async def _parsing_fetch(user_id: int) -> dict:
+    """fetch_user with realistic CPU: 1 ms of I/O wait, then decode a ~1 KB JSON body"""
+    await asyncio.sleep(0.001)
+    return json.loads(_USER_PAYLOAD)["users"][user_id % 20]
+
+
+def benchmark_sharding(n_calls: int = 50_000, max_in_flight: int = 200):
+    """Calls/sec: one event loop (stock / uvloop) vs. run_sharded over 1, 2, 4 processes"""
+    async def single() -> int:
+        return sum([1 async for o in fan_out(_parsing_fetch, range(n_calls), max_in_flight) if o.ok])
+
+    rows = [("asyncio loop, 1 process", lambda: run_async(single(), use_uvloop=False))]
+    if HAS_UVLOOP:
+        rows.append(("uvloop, 1 process", lambda: run_async(single(), use_uvloop=True)))
+    for processes in (1, 2, 4):
+        rows.append((f"run_sharded, {processes} process{'es' if processes > 1 else ''}",
+                     lambda p=processes: sum(1 for o in run_sharded(
+                         _parsing_fetch, range(n_calls), processes=p,
+                         max_in_flight=max_in_flight) if o.ok)))
+
+    print(f"=== Benchmark: {n_calls:,} CPU-bound fetches ({os.cpu_count()} CPU"
+          f"{'s' if os.cpu_count() != 1 else ''} here) ===")
+    for label, fn in rows:
+        start = time.perf_counter()
+        assert fn() == n_calls
+        print(f"  {label:26}: {n_calls / (time.perf_counter() - start):9,.0f} calls/s")
+
+
+def benchmark_adaptive_limit(phase_seconds: float = 4.0, service_time: float = 0.02,
+                             timeout: float = 0.25):
+    """Static windows vs. AdaptiveLimiter while the server's capacity drops and recovers"""
+    api = load_exercise("02_exercise_api_client.py")
+    phases = [20, 4, 20]  # server workers per phase
+    capacity = FiniteCapacity(phases[0], service_time)
+
+    async def run(max_in_flight: int, limiter: Optional[AdaptiveLimiter]) -> list[tuple]:
+        samples = []  # (phase, latency, ok)
+        phase = 0
+        async with api.AsyncAPIClient(server.base_url, max_concurrency=256, timeout=timeout,
+                                      coalesce=False) as client:
+            async def fetch(i: int):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    response = await client.get(f"users/{1 + i % 2}")
+                    if not response.is_success():  # raise, so the limiter counts it as a drop
+                        raise ConnectionError(response.error)
+                    ok = True
+                finally:
+                    samples.append((phase, time.perf_counter() - start, ok))
+
+            started = time.perf_counter()
+            end = started + phase_seconds * len(phases)
+            ids = takewhile(lambda _: time.perf_counter() < end, count())
+            limits = []
+            async for _ in fan_out(fetch, ids, max_in_flight, limiter):
+                new_phase = min(int((time.perf_counter() - started) / phase_seconds), len(phases) - 1)
+                if new_phase != phase:
+                    phase, capacity.workers = new_phase, phases[new_phase]
+                if limiter is not None:
+                    limits.append((phase, limiter.limit))
+        if limiter is not None:
+            for p in range(len(phases)):
+                tail = [limit for q, limit in limits if q == p][-200:]
+                print(f"      phase {p + 1}: limit ~{sum(tail) / max(len(tail), 1):5.1f}", end="")
+            print()
+        return samples
+
+    def report(label: str, samples: list[tuple]):
+        cells = []
+        for p in range(len(phases)):
+            mine = [(latency, ok) for q, latency, ok in samples if q == p]
+            good = sorted(latency for latency, ok in mine if ok)
+            p99 = good[int(0.99 * (len(good) - 1))] * 1000 if good else float("nan")
+            errors = sum(1 for _, ok in mine if not ok)
+            cells.append(f"{len(good) / phase_seconds:5.0f} ok/s p99 {p99:4.0f}ms err {errors:4}")
+        print(f"  {label:16}: " + " | ".join(cells))
+
+    with api.MockAPIServer(latency=capacity) as server:
+        print(f"=== Benchmark: adaptive concurrency (capacity {phases} x "
+              f"{service_time * 1000:.0f} ms, timeout {timeout * 1000:.0f} ms) ===")
+        print(f"  {'':16}  " + " | ".join(f"phase {p + 1}: {w:2} workers{'':17}"
+                                          for p, w in enumerate(phases)))
+        for label, max_in_flight, limiter in [
+            ("static 8", 8, None),
+            ("static 64", 64, None),
+            ("AIMD", 256, AdaptiveLimiter(initial_limit=8)),
+        ]:
+            capacity.workers = phases[0]
+            report(label, asyncio.run(run(max_in_flight, limiter)))
+
+
+def benchmark_session_warmup(burst: int = 32, trials: int = 15):
+    """First-request latency: plain AsyncAPIClient vs. a warmed NetworkSession"""
+    async def first_burst(warm: bool) -> tuple[float, float]:
+        options = dict(max_concurrency=burst, coalesce=False)
+        if warm:
+            session = NetworkSession(base_url, warm_connections=burst, **options)
+        else:
+            session = _api.AsyncAPIClient(base_url, **options)
+        async with session:
+            client = session.client if warm else session
+            start = time.perf_counter()
+            assert (await client.get("users/1")).is_success()
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.get(f"users/{1 + i % 2}") for i in range(burst)))
+            assert all(r.is_success() for r in responses)
+            return first, time.perf_counter() - start
+
+    def median(values: list[float]) -> float:
+        return sorted(values)[len(values) // 2] * 1000
+
+    with _api.MockAPIServer() as server:
+        base_url = server.base_url.replace("127.0.0.1", "localhost")  # make DNS part of the cost
+        print(f"=== Benchmark: first requests on a new session ({trials} trials, "
+              f"fresh event loop each, {base_url}) ===")
+        for label, warm in [("AsyncAPIClient (cold)", False), (f"NetworkSession warm={burst}", True)]:
+            runs = [asyncio.run(first_burst(warm)) for _ in range(trials)]
+            print(f"  {label:22}: first request {median([r[0] for r in runs]):6.2f} ms, "
+                  f"burst of {burst} {median([r[1] for r in runs]):6.2f} ms (median)")
 
 
 # ============================================================================
@@ -116,8 +1103,21 @@ async def run_examples():
 if __name__ == "__main__":
     # Run async code
     # In Swift: just use async/await
-    # In Python: use asyncio.run()
-    asyncio.run(run_examples())
+    # In Python: use asyncio.run() (run_async() = asyncio.run on uvloop if installed)
+    if "--bench" in sys.argv:
+        benchmark_batching()
+        print()
+        benchmark_hedging()
+        print()
+        benchmark_fan_out()
+        print()
+        benchmark_adaptive_limit()
+        print()
+        benchmark_sharding()
+        print()
+        benchmark_session_warmup()
+    else:
+        run_async(run_examples())
 
 
 # ============================================================================
@@ -141,6 +1141,7 @@ TODO - Complete these:
 4. Build an async context manager
    - async with NetworkSession() as session:
    -     data = await session.fetch(url)
+   - (NetworkSession above is one answer - try adding per-session default headers)
 
 HINT: In Python, we use:
 - async def for async functions (like async in Swift)
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: load the numbered exercise files as modules
+`import 02_exercise_api_client` is a syntax error, so load them by path.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_exercise(filename: str):
+    path = ROOT / filename
+    name = path.stem.lstrip("0123456789_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def api():
+    return load_exercise("02_exercise_api_client.py")
+
+
+@pytest.fixture
+def server(api):
+    with api.MockAPIServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def aio():
+    return load_exercise("03_exercise_async.py")
+
+
+@pytest.fixture(scope="session")
+def models():
+    return load_exercise("04_exercise_data_models.py")
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+
+def test_cancelled_calls_do_not_shrink_the_limit(aio):
+    limiter = aio.AdaptiveLimiter(initial_limit=8)
+
+    async def main():
+        calls = [asyncio.ensure_future(limiter.call(lambda: asyncio.sleep(1))) for _ in range(8)]
+        await asyncio.sleep(0.01)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+    asyncio.run(main())
+    assert limiter.limit == 8 and limiter.decreases == 0
+    assert limiter.in_flight == 0
+
+
+def test_failures_shrink_the_limit(aio):
+    limiter = aio.AdaptiveLimiter(initial_limit=8)
+
+    async def fail():
+        raise ConnectionError("reset")
+
+    async def main():
+        with pytest.raises(ConnectionError):
+            await limiter.call(fail)
+
+    asyncio.run(main())
+    assert limiter.limit < 8 and limiter.in_flight == 0
+
+
+def test_waiters_get_slots_freed_by_cancellation(aio):
+    limiter = aio.AdaptiveLimiter(initial_limit=1)
+
+    async def main():
+        first = asyncio.ensure_future(limiter.call(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(limiter.call(lambda: asyncio.sleep(0, "done")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.wait_for(second, 1)
+
+    assert asyncio.run(main()) == "done"
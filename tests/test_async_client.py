@@ -0,0 +1,46 @@
+import asyncio
+
+
+def test_connections_are_reused(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            for i in range(5):
+                assert (await client.get(f"users/{1 + i % 2}")).is_success()
+        return client
+
+    client = asyncio.run(main())
+    assert client.pool.connections_opened == 1
+
+
+def test_max_concurrency_caps_open_connections(api, server):
+    server.latency = 0.05
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url, max_concurrency=3, coalesce=False) as client:
+            responses = await asyncio.gather(*(client.get("users/1") for _ in range(12)))
+        return client, responses
+
+    client, responses = asyncio.run(main())
+    assert all(r.is_success() for r in responses)
+    assert client.pool.connections_opened == 3
+    assert server.requests_served == 12
+
+
+def test_http_errors_become_error_responses(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            return await client.get("users/999")
+
+    response = asyncio.run(main())
+    assert not response.is_success() and "404" in response.error
+
+
+def test_post_and_delete(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            created = await client.post("users", {"name": "Dana", "email": "dana@example.com"})
+            deleted = await client.delete(f"users/{created.data['id']}")
+            return created, deleted
+
+    created, deleted = asyncio.run(main())
+    assert created.is_success() and deleted.data is True
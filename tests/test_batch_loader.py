@@ -0,0 +1,61 @@
+import asyncio
+import gc
+
+import pytest
+
+
+async def bulk(keys):
+    await asyncio.sleep(0.05)
+    return {key: key * 10 for key in keys}
+
+
+def test_duplicate_keys_share_one_batch(aio):
+    async def main():
+        loader = aio.BatchLoader(bulk)
+        values = await asyncio.gather(*(loader.load(key) for key in [1, 2, 1, 3]))
+        return loader, values
+
+    loader, values = asyncio.run(main())
+    assert values == [10, 20, 10, 30]
+    assert loader.batches_sent == 1
+
+
+def test_one_callers_timeout_does_not_cancel_the_others(aio):
+    async def main():
+        loader = aio.BatchLoader(bulk)
+        impatient = asyncio.ensure_future(asyncio.wait_for(loader.load(1), 0.01))
+        patient = asyncio.ensure_future(loader.load(1))
+        with pytest.raises(asyncio.TimeoutError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(main()) == 10
+
+
+def test_missing_key_raises_key_error(aio):
+    async def main():
+        loader = aio.BatchLoader(lambda keys: bulk([k for k in keys if k != 2]))
+        return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    ok, missing = asyncio.run(main())
+    assert ok == 10 and isinstance(missing, KeyError)
+
+
+def test_failed_batch_with_no_waiters_left_logs_nothing(aio):
+    async def failing(keys):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("bulk endpoint down")
+
+    async def main():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: errors.append(ctx))
+        loader = aio.BatchLoader(failing)
+        waiter = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.1)  # the batch fails after its only waiter left
+        del waiter, loader
+        gc.collect()
+        return errors
+
+    assert asyncio.run(main()) == []
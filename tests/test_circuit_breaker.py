@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+
+def test_cancelled_half_open_trial_frees_its_slot(api, server):
+    breaker = api.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.after_call(500, None)
+    assert breaker.state == breaker.OPEN
+    time.sleep(0.06)
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url, breaker=breaker, coalesce=False) as client:
+            server.latency = 0.5
+            trial = asyncio.ensure_future(client.get("users/1"))
+            await asyncio.sleep(0.05)
+            trial.cancel()  # e.g. a losing hedge
+            await asyncio.gather(trial, return_exceptions=True)
+            server.latency = 0.0
+            return await client.get("users/1")
+
+    response = asyncio.run(main())
+    assert response.is_success(), response.error
+    assert breaker.state == breaker.CLOSED
+
+
+def test_stale_half_open_state_allows_a_new_trial(api):
+    breaker = api.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.after_call(500, None)
+    time.sleep(0.06)
+    breaker.before_call()  # trial that never reports back
+    try:
+        breaker.before_call()
+        raise AssertionError("second trial admitted while the first is pending")
+    except api.CircuitOpenError:
+        pass
+    time.sleep(0.06)
+    breaker.before_call()  # reset_timeout later a new trial goes out
+    breaker.after_call(200, None)
+    assert breaker.state == breaker.CLOSED
+
+
+def test_flaky_server_opens_then_recovers(api, server):
+    breaker = api.CircuitBreaker(failure_threshold=3, reset_timeout=0.1)
+    client = api.APIClient(server.base_url, breaker=breaker)
+    server.fail_next = 3
+    for _ in range(3):
+        assert not client.get("users/1").is_success()
+    assert breaker.state == breaker.OPEN
+
+    # open: fail fast, nothing reaches the server
+    assert "circuit open" in client.get("users/1").error
+    assert server.requests_served == 0 and breaker.rejected == 1
+
+    time.sleep(0.12)
+    assert client.get("users/1").is_success()  # the half-open trial succeeds
+    assert breaker.state == breaker.CLOSED
+    assert [(old, new) for _, old, new in breaker.transitions] == [
+        ("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+
+
+def test_listeners_run_outside_the_lock(api):
+    seen = []
+
+    def listener(old, new):
+        breaker.release_trial()  # re-entering the breaker must not deadlock
+        seen.append((old, new, breaker.state))
+
+    breaker = api.CircuitBreaker(failure_threshold=1, reset_timeout=0.01, on_state_change=listener)
+    breaker.after_call(500, None)
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.after_call(200, None)
+    assert seen == [("closed", "open", "open"), ("open", "half_open", "half_open"),
+                    ("half_open", "closed", "closed")]
+
+
+def test_rate_limiter_spaces_out_calls_after_the_burst(api):
+    limiter = api.RateLimiter(rate=50, burst=5)
+    start = time.monotonic()
+    for _ in range(15):
+        limiter.acquire()
+    assert time.monotonic() - start >= 10 / 50 - 0.01
+
+
+def test_async_callers_share_the_bucket(api):
+    limiter = api.RateLimiter(rate=100, burst=1)
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.aacquire() for _ in range(11)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 10 / 100 - 0.01
+
+
+def test_pause_blocks_the_whole_bucket(api):
+    limiter = api.RateLimiter(rate=1000, burst=10)
+    limiter.pause(0.1)
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_get_rate_limiter_is_shared_per_host_and_rejects_other_settings(api):
+    a = api.get_rate_limiter("http://limited.test:1/v1", rate=20, burst=2)
+    assert api.get_rate_limiter("http://limited.test:1/v2", rate=20, burst=2) is a
+    with pytest.raises(ValueError):
+        api.get_rate_limiter("http://limited.test:1/v1", rate=40, burst=2)
+
+
+def test_client_requests_respect_the_limiter(api, server):
+    client = api.APIClient(server.base_url, rate_limiter=api.RateLimiter(rate=40, burst=1))
+    start = time.monotonic()
+    assert all(client.get("users/1").is_success() for _ in range(5))
+    assert time.monotonic() - start >= 4 / 40 - 0.01
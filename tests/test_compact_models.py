@@ -0,0 +1,21 @@
+import pickle
+
+
+def test_compact_twins_are_named_after_their_globals(models):
+    for name in ("CompactUser", "FrozenUser", "CompactComment", "CompactPostWithComments"):
+        cls = getattr(models, name)
+        assert cls.__name__ == cls.__qualname__ == name
+
+
+def test_compact_twins_pickle(models):
+    user = models.CompactUser(1, "Alice")
+    frozen = models.FrozenUser(2, "Bob")
+    assert pickle.loads(pickle.dumps(user)) == user
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+def test_compact_round_trips_through_from_dict(models):
+    comment = models.CompactComment(id=1, text="Nice", author=models.CompactUser(id=1, name="Alice"))
+    post = models.CompactPostWithComments(id=1, title="Slots", author=comment.author, comments=[comment])
+    again = models.CompactPostWithComments.from_dict(post.to_dict())
+    assert again == post and type(again.comments[0]) is models.CompactComment
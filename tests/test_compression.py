@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+PAYLOAD = json.dumps([{"id": i, "name": f"User{i}", "bio": "x" * 50} for i in range(2000)]).encode()
+
+
+def decode(api, chunks, encoding):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def main():
+        return b"".join([part async for part in api.decode_body(source(), encoding)])
+
+    return asyncio.run(main())
+
+
+def codec(api, name):
+    if name not in api.CODECS:
+        pytest.skip(f"{name} codec not installed")
+    return api.CODECS[name]
+
+
+@pytest.mark.parametrize("name", ["gzip", "br", "zstd"])
+@pytest.mark.parametrize("chunk_size", [1, 100, 1 << 20])
+def test_decode_body_in_any_chunking(api, name, chunk_size):
+    body = codec(api, name).compress(PAYLOAD)
+    assert len(body) < len(PAYLOAD) // 5
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    assert decode(api, chunks, name) == PAYLOAD
+
+
+@pytest.mark.parametrize("encoding", [None, "identity"])
+def test_identity_passes_through(api, encoding):
+    assert decode(api, [b"ab", b"c"], encoding) == b"abc"
+
+
+def test_unknown_encoding_raises(api):
+    with pytest.raises(ValueError, match="unsupported Content-Encoding"):
+        decode(api, [b""], "compress")
+
+
+def test_choose_encoding_honours_order_and_q0(api):
+    assert api.choose_encoding("gzip;q=0, identity") is None
+    assert api.choose_encoding("unknown, gzip") == "gzip"
+    assert api.choose_encoding(None) is None
+
+
+@pytest.mark.parametrize("name", ["gzip", "br", "zstd"])
+def test_async_client_decodes_compressed_responses(api, server, name):
+    codec(api, name)
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            client.headers["Accept-Encoding"] = name
+            return await client.get("users")
+
+    response = asyncio.run(main())
+    assert response.is_success(), response.error
+    assert [u["id"] for u in response.data["users"]] == [1, 2]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"
+
+
+async def read_request(reader, received: list):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = [int(line.split(b":")[1]) for line in head.split(b"\r\n")
+              if line.lower().startswith(b"content-length")]
+    await reader.readexactly(length[0] if length else 0)
+    received.append(head.split(b" ")[0].decode())
+
+
+async def flaky_keep_alive_server(received: list, drop_second: bool):
+    """
+    Answers the first request on each connection without Connection: close, then
+    drop_second=True  -> reads a second request and hangs up without replying
+    drop_second=False -> hangs up right away (the client sees it while idle)
+    """
+    async def handle(reader, writer):
+        try:
+            await read_request(reader, received)
+            writer.write(OK)
+            await writer.drain()
+            if drop_second:
+                await read_request(reader, received)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def run(api, method: str, drop_second: bool):
+    received = []
+
+    async def main():
+        server = await flaky_keep_alive_server(received, drop_second)
+        port = server.sockets[0].getsockname()[1]
+        pool = api.AsyncConnectionPool(f"http://127.0.0.1:{port}", max_connections=1)
+        try:
+            assert (await pool.request("GET", "/", {})).status == 200
+            await asyncio.sleep(0.05)
+            return await pool.request(method, "/", {}, b'{"a": 1}'), pool
+        finally:
+            await pool.close()
+            server.close()
+
+    try:
+        result = asyncio.run(main())
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        result = e
+    return result, received
+
+
+def test_idempotent_request_is_retried_on_a_fresh_connection(api):
+    (response, pool), received = run(api, "GET", drop_second=True)
+    assert response.status == 200
+    assert received == ["GET", "GET", "GET"] and pool.connections_opened == 2
+
+
+def test_post_on_a_dropped_keep_alive_socket_is_not_resent(api):
+    error, received = run(api, "POST", drop_second=True)
+    assert isinstance(error, ConnectionError)
+    assert received == ["GET", "POST"]  # once - the server may have acted on it
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_socket_closed_while_idle_is_skipped_before_sending(api, method):
+    (response, pool), received = run(api, method, drop_second=False)
+    assert response.status == 200
+    assert received == ["GET", method] and pool.connections_opened == 2
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+
+
+@pytest.fixture
+def slow_server(api):
+    with api.MockAPIServer(latency=1.0) as server:
+        yield server
+
+
+def elapsed_since(start: float) -> float:
+    return time.perf_counter() - start
+
+
+def test_async_deadline_cancels_the_whole_fan_out(aio):
+    live = 0
+
+    async def tracked(user_id: int) -> dict:
+        nonlocal live
+        live += 1
+        try:
+            return await aio.fetch_user(user_id)  # 1 s each
+        finally:
+            live -= 1
+
+    async def main():
+        start = time.perf_counter()
+        with pytest.raises(aio.DeadlineExceeded):
+            async with aio.Deadline(0.3):
+                await asyncio.gather(*(tracked(uid) for uid in range(1, 4)))
+        assert elapsed_since(start) < 0.4
+        assert asyncio.all_tasks() == {asyncio.current_task()}  # nothing left running
+
+    asyncio.run(main())
+    assert live == 0
+
+
+def test_inner_timeouts_are_shortened_to_the_time_left(aio):
+    async def main():
+        with aio.Deadline(0.3):
+            return await aio.fetch_with_timeout(delay=1, timeout=5)
+
+    start = time.perf_counter()
+    assert asyncio.run(main()) is None
+    assert elapsed_since(start) < 0.4
+
+
+def test_nested_deadlines_shorten_but_never_extend(aio):
+    with aio.Deadline(0.2) as outer, aio.Deadline(10) as inner:
+        assert inner.expires_at == outer.expires_at
+    with aio.Deadline(10) as outer, aio.Deadline(0.2) as inner:
+        assert inner.expires_at < outer.expires_at
+
+
+def test_expired_deadline_fails_new_work_before_it_starts(aio):
+    async def main():
+        with aio.Deadline(0.05):
+            await asyncio.sleep(0.06)
+            with pytest.raises(aio.DeadlineExceeded):
+                await aio.fetch_user(1)
+
+    asyncio.run(main())
+
+
+def test_sync_client_with_retries_is_capped(api, aio, slow_server):
+    client = api.APIClient(slow_server.base_url, retry=api.RetryPolicy(max_attempts=5))
+    start = time.perf_counter()
+    with aio.Deadline(0.3):
+        response = client.get("users/1")
+    assert not response.is_success()
+    assert elapsed_since(start) < 0.5
+
+
+def test_async_client_with_retries_is_capped(api, aio, slow_server):
+    async def main():
+        async with api.AsyncAPIClient(slow_server.base_url,
+                                      retry=api.RetryPolicy(max_attempts=5)) as client:
+            with pytest.raises(aio.DeadlineExceeded):
+                async with aio.Deadline(0.3):
+                    await client.get("users/1")
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert elapsed_since(start) < 0.5
+
+
+def test_async_stream_is_capped_by_a_sync_deadline(api, aio, slow_server):
+    async def main():
+        async with api.AsyncAPIClient(slow_server.base_url) as client:
+            with pytest.raises(TimeoutError):
+                with aio.Deadline(0.3):
+                    [user async for user in client.stream("users")]
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert elapsed_since(start) < 0.5
+
+
+def test_async_stream_still_reads_everything_without_a_deadline(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            return [user async for user in client.stream("users")]
+
+    assert len(asyncio.run(main())) == len(server.users)
+
+
+def test_coalesced_get_runs_outside_the_first_callers_deadline(api, aio):
+    with api.MockAPIServer(latency=0.3) as server:
+        async def hurried(client):
+            with aio.Deadline(0.1):
+                return await client.get("users/1")
+
+        async def main(first, second):
+            async with api.AsyncAPIClient(server.base_url) as client:
+                a = asyncio.ensure_future(first(client))
+                await asyncio.sleep(0)  # `first` starts the shared call
+                b = asyncio.ensure_future(second(client))
+                return await a, await b
+
+        patient = lambda client: client.get("users/1")  # noqa: E731
+        start = time.perf_counter()
+        short, long = asyncio.run(main(hurried, patient))
+        assert long.is_success(), long.error
+        assert "deadline" in short.error
+        long, short = asyncio.run(main(patient, hurried))
+        assert long.is_success(), long.error
+        assert "deadline" in short.error
+        assert server.requests_served == 2  # one shared call per run
+        assert elapsed_since(start) < 1.0
+
+
+def test_batch_runs_outside_the_first_callers_deadline(aio):
+    budgets = []
+
+    async def bulk(keys):
+        budgets.append(aio.time_budget())
+        await asyncio.sleep(0.2)
+        aio.time_budget()  # would raise DeadlineExceeded under the first caller's deadline
+        return {key: key * 10 for key in keys}
+
+    async def main():
+        loader = aio.BatchLoader(bulk)
+
+        async def hurried():
+            with aio.Deadline(0.05):  # its load() schedules the dispatch
+                return await loader.load(1)
+
+        async def patient(key):
+            return await loader.load(key)
+
+        return await asyncio.gather(hurried(), patient(1), patient(2), return_exceptions=True)
+
+    short, one, two = asyncio.run(main())
+    assert isinstance(short, aio.DeadlineExceeded)
+    assert (one, two) == (10, 20)
+    assert budgets == [None]
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+
+
+def collect(aio, fn, items, **kwargs):
+    async def main():
+        return [o async for o in aio.fan_out(fn, items, **kwargs)]
+    return asyncio.run(main())
+
+
+def test_every_item_is_reported_once(aio):
+    async def double(x):
+        await asyncio.sleep(0.001 * (x % 3))
+        return x * 2
+
+    outcomes = collect(aio, double, range(50), max_in_flight=7)
+    assert sorted(o.item for o in outcomes) == list(range(50))
+    assert all(o.ok and o.result == o.item * 2 for o in outcomes)
+
+
+def test_window_caps_calls_in_flight(aio):
+    in_flight = peak = 0
+
+    async def call(x):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+
+    collect(aio, call, range(40), max_in_flight=5)
+    assert peak == 5
+
+
+def test_items_are_pulled_lazily(aio):
+    pulled = []
+
+    def ids():
+        for i in range(1_000_000):
+            pulled.append(i)
+            yield i
+
+    async def main():
+        async with contextlib.aclosing(aio.fan_out(echo, ids(), max_in_flight=10)) as outcomes:
+            async for outcome in outcomes:
+                if outcome.item == 0:
+                    break
+
+    async def echo(x):
+        await asyncio.sleep(0)
+        return x
+
+    asyncio.run(main())
+    assert len(pulled) <= 11
+
+
+def test_failures_become_outcomes_and_the_rest_finish(aio):
+    async def call(x):
+        if x % 4 == 0:
+            raise ValueError(x)
+        return x
+
+    outcomes = collect(aio, call, range(12), max_in_flight=3)
+    failed = sorted(o.item for o in outcomes if not o.ok)
+    assert failed == [0, 4, 8]
+    assert all(isinstance(o.error, ValueError) for o in outcomes if not o.ok)
+    assert len(outcomes) == 12
+
+
+def test_breaking_out_cancels_the_window(aio):
+    cancelled = []
+
+    async def call(x):
+        try:
+            await asyncio.sleep(0 if x == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(x)
+            raise
+
+    async def main():
+        async with contextlib.aclosing(aio.fan_out(call, range(100), max_in_flight=4)) as outcomes:
+            async for _ in outcomes:
+                break
+        await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+    # 1-3 were sleeping; 4 (the refill) is cancelled before it ever runs
+    assert sorted(cancelled) == [1, 2, 3]
@@ -0,0 +1,84 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pytest
+
+
+def test_optional_list_of_models_is_decoded(models):
+    @models.fast_codec
+    @dataclass
+    class Thread:
+        id: int
+        comments: Optional[List[models.Comment]] = None
+
+    data = {"id": 1, "comments": [{"id": 1, "text": "Hi", "author": {"id": 1, "name": "Alice"}}]}
+    thread = Thread.from_dict(data)
+    assert type(thread.comments[0]) is models.Comment
+    assert type(thread.comments[0].author) is models.User
+    assert Thread.from_dict(thread.to_dict()) == thread
+    assert Thread.from_row(thread.to_row()) == thread
+    assert Thread.from_dict_pooled(data, models.ModelPool()) == thread
+    assert Thread.from_dict({"id": 2}).comments is None
+
+
+def test_unsupported_nested_shapes_fail_at_decoration(models):
+    with pytest.raises(TypeError, match="fast_codec"):
+        @models.fast_codec
+        @dataclass
+        class Directory:
+            users: Dict[str, models.User]
+
+
+POST = {
+    "id": 1, "title": "My Post", "author": {"id": 1, "name": "Alice"},
+    "comments": [{"id": i, "text": f"c{i}", "author": {"id": 2, "name": "Bob"}} for i in range(3)],
+}
+
+
+@pytest.mark.parametrize("encode", [lambda d: d, json.dumps, lambda d: json.dumps(d).encode()])
+def test_lazy_view_decodes_fields_on_first_read(models, encode):
+    post = models.lazy(models.PostWithComments, encode(POST))
+    assert "title" not in post.__dict__
+    assert post.title == "My Post"
+    assert "title" in post.__dict__ and "comments" not in post.__dict__
+    assert post.author.name == "Alice" and isinstance(post.author, models.LazyModel)
+    assert post.materialize() == models.PostWithComments.from_dict(POST)
+
+
+def test_lazy_view_class_is_built_once(models):
+    view = models.lazy_view(models.PostWithComments)
+    assert models.lazy_view(models.PostWithComments) is view
+    assert view.__name__ == "LazyPostWithComments" and issubclass(view, models.LazyModel)
+
+
+def test_lazy_list_indexing_slicing_and_caching(models):
+    comments = models.lazy(models.PostWithComments, POST).comments
+    assert isinstance(comments, models.LazyList) and len(comments) == 3
+    assert comments[0] is comments[0]
+    assert comments[-1].id == 2
+    assert [c.id for c in comments[1:]] == [1, 2]
+    assert [c.author.name for c in comments] == ["Bob"] * 3
+
+
+def test_lazy_missing_required_field_raises_key_error(models):
+    post = models.lazy(models.PostWithComments, {"id": 1, "author": {"id": 1, "name": "A"}})
+    with pytest.raises(KeyError, match="title"):
+        post.title
+    with pytest.raises(KeyError):
+        models.PostWithComments.from_dict({"id": 1, "author": {"id": 1, "name": "A"}})
+
+
+def test_lazy_defaults_and_default_factories(models):
+    @models.fast_codec
+    @dataclass
+    class Tagged:
+        id: int
+        note: Optional[str] = None
+        tags: List[str] = field(default_factory=list)
+        authors: List[models.User] = field(default_factory=list)
+
+    a, b = models.lazy(Tagged, {"id": 1}), models.lazy(Tagged, {"id": 2})
+    assert a.note is None and a.tags == [] and a.authors == []
+    assert a.tags is not b.tags  # a fresh list per view, like from_dict
+    assert a.materialize() == Tagged.from_dict({"id": 1})
@@ -0,0 +1,34 @@
+import asyncio
+
+
+def test_hedged_get_sends_a_real_duplicate_on_a_coalescing_client(api, aio, server):
+    latencies = iter([0.5, 0.01])  # the first request is a straggler
+    server.latency = lambda: next(latencies, 0.01)
+    policy = aio.HedgePolicy(initial_delay=0.05)
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:  # coalesce=True
+            start = asyncio.get_running_loop().time()
+            response = await client.get("users/1", hedge=policy)
+            elapsed = asyncio.get_running_loop().time() - start
+            await asyncio.sleep(0.5)  # let the server finish the cancelled straggler
+            return response, elapsed
+
+    response, elapsed = asyncio.run(main())
+    assert response.is_success()
+    assert server.requests_served == 2
+    assert policy.hedges_sent == 1 and policy.hedges_won == 1
+    assert elapsed < 0.3
+
+
+def test_error_response_is_not_a_win(api, aio, server):
+    server.fail_next = 1  # first request gets a 5xx, the hedge succeeds
+    policy = aio.HedgePolicy(initial_delay=0.05)
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            return await client.get("users/1", hedge=policy)
+
+    response = asyncio.run(main())
+    assert response.is_success(), response.error
+    assert policy.hedges_sent == 1
@@ -0,0 +1,37 @@
+import pytest
+
+
+def post(i: int) -> bytes:
+    return b'{"id": %d, "title": "T%d", "content": "...", "author_id": 1}' % (i, i)
+
+
+@pytest.fixture
+def ingest(models):
+    if not models.HAS_PYDANTIC:
+        pytest.skip("pydantic not installed")
+    return lambda lines: models._ingest_lines(lines, 0)
+
+
+def test_bad_rows_are_reported_with_their_line_numbers(ingest):
+    result = ingest([post(1), b'{"id": "x", "title": "T", "content": "", "author_id": 1}',
+                     b"not json", post(4)])
+    assert [p.id for p in result.posts] == [1, 4]
+    assert [e.row for e in result.errors] == [1, 2]
+    assert result.rows == 4
+
+
+def test_line_holding_two_objects_is_one_bad_row(ingest):
+    result = ingest([post(1), post(9) + b", " + post(10), post(3)])
+    assert [p.id for p in result.posts] == [1, 3]
+    assert [e.row for e in result.errors] == [1]
+    assert result.rows == 3
+
+
+def test_lines_that_only_make_sense_spliced_are_bad_rows(ingest):
+    # `[{..}` + `{..}]` nest into one row and `{..}, {..}` adds one back:
+    # the row count matches, so only a per-line boundary check catches it
+    lines = [b"[" + post(1), post(2) + b"]", post(9) + b", " + post(10), post(4)]
+    result = ingest(lines)
+    assert [p.id for p in result.posts] == [4]
+    assert [e.row for e in result.errors] == [0, 1, 2]
+    assert result.rows == 4
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+DOCUMENT = json.dumps({
+    "total": 3,
+    "meta": {"tags": ["[", "]"], "note": "braces { } and \"quotes\""},
+    "users": [
+        {"id": 1, "name": "Ann \"The Admin\"", "roles": [["a", "b"], []], "score": 12.5},
+        {"id": 2, "name": "Bé ]}", "nested": {"deep": [{"x": [1, [2, [3]]]}]}},
+        {"id": 3, "name": "back\\slash\\", "score": -1e3},
+    ],
+    "after": [0],
+}, ensure_ascii=False).encode()
+EXPECTED = json.loads(DOCUMENT)["users"]
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_any_chunking_yields_the_same_records(api, size):
+    assert list(api.iter_json_array(split(DOCUMENT, size))) == EXPECTED
+
+
+def test_every_single_split_point(api):
+    for cut in range(1, len(DOCUMENT)):
+        chunks = [DOCUMENT[:cut], DOCUMENT[cut:]]
+        assert list(api.iter_json_array(chunks)) == EXPECTED, cut
+
+
+def test_number_cut_at_the_chunk_boundary(api):
+    assert list(api.iter_json_array([b"[12", b"34, 5.", b"25]"], key=None)) == [1234, 5.25]
+
+
+def test_elements_arrive_as_soon_as_they_are_complete(api):
+    parser = api.JSONArrayStream(key=None)
+    assert parser.feed(b'[{"a": "x]"}, {"b"') == [{"a": "x]"}]
+    assert parser.feed(b': 2}]') == [{"b": 2}]
+    assert parser.close() == []
+
+
+def test_truncated_document_raises(api):
+    parser = api.JSONArrayStream()
+    parser.feed(b'{"users": [{"id": 1}, {"id": 2')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_missing_key_raises(api):
+    with pytest.raises(KeyError):
+        list(api.iter_json_array([b'{"posts": []}']))
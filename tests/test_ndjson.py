@@ -0,0 +1,18 @@
+import io
+
+import pytest
+
+
+def test_round_trip(models):
+    buffer = io.BytesIO()
+    users = [models.User(id=i, name=f"User{i}") for i in range(1, 4)]
+    assert models.write_ndjson(buffer, users) == 3
+    buffer.seek(0)
+    assert list(models.read_ndjson(buffer, models.User)) == users
+
+
+@pytest.mark.parametrize("bad_line", [b"not json", b'{"id": 3}', b"[1, 2]"])
+def test_failing_line_number_is_reported(models, bad_line):
+    buffer = io.BytesIO(b'{"id": 1, "name": "A"}\n\n{"id": 2, "name": "B"}\n' + bad_line + b"\n")
+    with pytest.raises(ValueError, match="^line 4: "):
+        list(models.read_ndjson(buffer, models.User))
@@ -0,0 +1,83 @@
+import asyncio
+import socket
+
+import pytest
+
+
+def localhost(server) -> str:
+    return server.base_url.replace("127.0.0.1", "localhost")
+
+
+def test_enter_resolves_and_warms_exit_drains(aio, server):
+    server.latency = 0.2
+
+    async def main():
+        async with aio.NetworkSession(localhost(server), warm_connections=4) as session:
+            pool = session.client.pool
+            assert pool.address is not None and pool.connections_opened == 4
+            assert await session.fetch("users/1") == {"id": 1, "name": "Alice"}
+            late = asyncio.create_task(session.fetch("users/2"))
+            await asyncio.sleep(0.05)  # in flight when the block exits
+        assert session.drained and late.done() and late.result()["id"] == 2
+        assert pool.connections_opened == 4 and not pool._idle
+        with pytest.raises(RuntimeError, match="closing"):
+            await session.fetch("users/3")
+
+    asyncio.run(main())
+
+
+def test_unreachable_first_address_falls_back(aio, server, monkeypatch):
+    real = asyncio.BaseEventLoop.getaddrinfo
+
+    async def ipv6_first(self, host, port, *args, **kwargs):
+        infos = await real(self, host, port, *args, **kwargs)
+        if host != "localhost":
+            return infos
+        return [(socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", port, 0, 0)), *infos]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", ipv6_first)
+
+    async def main():
+        async with aio.NetworkSession(localhost(server), warm_connections=2) as session:
+            assert session.warm_up_error is None
+            assert session.client.pool.address == "127.0.0.1"  # the one that answered
+            return [await session.fetch(f"users/{i}") for i in (1, 2)]
+
+    assert [user["id"] for user in asyncio.run(main())] == [1, 2]
+
+
+def test_failed_warm_up_drops_the_pinned_address(aio):
+    async def main():
+        async with aio.NetworkSession("http://localhost:9", warm_connections=2) as session:
+            assert session.warm_up_error is not None
+            assert session.client.pool.addresses == []
+
+    asyncio.run(main())
+
+
+def test_exit_waits_for_fetches_in_retry_backoff(api, aio, server):
+    server.fail_next = 1  # first attempt 503s, the retry succeeds after its backoff
+    retry = api.RetryPolicy(max_attempts=3)
+    retry.backoff = lambda attempt: 0.3  # no jitter: still sleeping when the block exits
+
+    async def main():
+        async with aio.NetworkSession(server.base_url, warm_connections=1, retry=retry) as session:
+            pending = asyncio.create_task(session.fetch("users/1"))
+            await asyncio.sleep(0.05)  # first attempt failed, now sleeping
+            assert session.client.in_flight == 1
+        assert session.drained and pending.done()
+        return pending.result()
+
+    assert asyncio.run(main())["id"] == 1
+
+
+def test_closed_pool_refuses_new_connections(aio, server):
+    async def main():
+        session = aio.NetworkSession(server.base_url, warm_connections=0, drain_timeout=0)
+        async with session:
+            pass
+        response = await session.client.get("users/1")  # bypasses the session's closing check
+        assert not response.is_success() and "closed" in response.error
+        assert session.client.pool.connections_opened == 0
+
+    asyncio.run(main())
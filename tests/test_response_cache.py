@@ -0,0 +1,59 @@
+import time
+
+
+def entry(api, size):
+    return api.CacheEntry(b"x" * size, None, None)
+
+
+def test_lru_evicts_least_recently_used(api):
+    cache = api.ResponseCache(max_entries=2)
+    cache.store("a", entry(api, 1))
+    cache.store("b", entry(api, 1))
+    cache.lookup("a")  # a is now most recent
+    cache.store("c", entry(api, 1))
+    assert cache.lookup("b") == (None, False)
+    assert cache.lookup("a")[0] is not None and cache.lookup("c")[0] is not None
+    assert cache.evictions == 1
+
+
+def test_byte_cap_evicts_and_skips_oversized_bodies(api):
+    cache = api.ResponseCache(max_bytes=10)
+    cache.store("a", entry(api, 6))
+    cache.store("b", entry(api, 6))
+    assert cache.lookup("a")[0] is None and cache.total_bytes == 6
+    cache.store("huge", entry(api, 11))
+    assert cache.lookup("huge")[0] is None and cache.stats()["entries"] == 1
+
+
+def test_fresh_entries_are_served_without_a_request(api, server):
+    cache = api.ResponseCache(ttl=60)
+    client = api.APIClient(server.base_url, cache=cache)
+    first, second = client.get("users/1"), client.get("users/1")
+    assert first.data == second.data
+    assert server.requests_served == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_entry_is_revalidated_with_a_304(api, server):
+    cache = api.ResponseCache(ttl=0.05)
+    client = api.APIClient(server.base_url, cache=cache)
+    first = client.get("users/1")
+    bytes_after_first = server.bytes_sent
+    time.sleep(0.1)
+    second = client.get("users/1")
+    assert second.data == first.data
+    assert server.requests_served == 2
+    assert server.bytes_sent == bytes_after_first  # 304: headers only
+    assert cache.revalidations == 1 and cache.misses == 1
+    # the 304 made the entry fresh again
+    client.get("users/1")
+    assert server.requests_served == 2 and cache.hits == 1
+
+
+def test_writes_invalidate_cached_reads(api, server):
+    cache = api.ResponseCache(ttl=60)
+    client = api.APIClient(server.base_url, cache=cache)
+    before = client.get("users")
+    client.post("users", {"name": "Dana", "email": "dana@example.com"})
+    after = client.get("users")
+    assert len(after.data["users"]) == len(before.data["users"]) + 1
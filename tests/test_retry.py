@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+
+class Result:
+    def __init__(self, status):
+        self.status_code = status
+
+
+def scripted(*outcomes):
+    """send() returning/raising each outcome in turn"""
+    calls = []
+
+    def send():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return Result(outcome)
+
+    return send, calls
+
+
+def policy(api, **kwargs):
+    retry = api.RetryPolicy(**kwargs)
+    retry.backoff = lambda attempt: 0
+    return retry
+
+
+def test_backoff_is_full_jitter_capped_at_max_delay(api):
+    retry = api.RetryPolicy(base_delay=0.1, max_delay=0.3)
+    for attempt, cap in [(1, 0.1), (2, 0.2), (3, 0.3), (10, 0.3)]:
+        assert all(0 <= retry.backoff(attempt) <= cap for _ in range(200))
+
+
+def test_retries_retryable_statuses_until_success(api):
+    retry = policy(api)
+    send, calls = scripted(503, 502, 200)
+    assert retry.call("GET", send).status_code == 200
+    assert len(calls) == 3 and retry.stats.retries == 2
+
+
+def test_gives_up_after_max_attempts(api):
+    retry = policy(api, max_attempts=2)
+    send, calls = scripted(503, 503, 503)
+    assert retry.call("GET", send).status_code == 503
+    assert len(calls) == 2
+
+
+def test_non_idempotent_methods_and_other_statuses_are_not_retried(api):
+    retry = policy(api)
+    send, calls = scripted(503)
+    assert retry.call("POST", send).status_code == 503
+    send, calls = scripted(404)
+    assert retry.call("GET", send).status_code == 404
+    assert retry.stats.retries == 0
+
+
+def test_connection_errors_retry_other_errors_raise(api):
+    retry = policy(api)
+    send, calls = scripted(ConnectionError("reset"), 200)
+    assert retry.call("GET", send).status_code == 200
+    send, calls = scripted(ValueError("bug"), 200)
+    with pytest.raises(ValueError):
+        retry.call("GET", send)
+    assert len(calls) == 1
+
+
+def test_no_retry_that_would_start_after_the_deadline(api):
+    retry = api.RetryPolicy(base_delay=10, max_delay=10)
+    retry.backoff = lambda attempt: 1.0
+    send, calls = scripted(503, 200)
+    with api.Deadline(0.5):
+        assert retry.call("GET", send).status_code == 503
+    assert len(calls) == 1
+
+
+def test_budget_refills_from_successes_only(api):
+    budget = api.RetryBudget(max_tokens=2, ratio=0.5)
+    assert budget.try_withdraw() and budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    assert not budget.try_withdraw()  # half a token
+    budget.deposit()
+    assert budget.try_withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2  # capped at max_tokens
+
+
+def test_empty_budget_stops_retry_storms(api):
+    retry = policy(api, max_attempts=5, budget=api.RetryBudget(max_tokens=1, ratio=0.1))
+    send, calls = scripted(503, 503, 503, 503, 503)
+    assert retry.call("GET", send).status_code == 503
+    assert len(calls) == 2  # one token = one retry
+    assert retry.stats.budget_exhausted == 1
+
+
+def test_async_policy_shares_the_same_rules(api):
+    retry = policy(api)
+    send, calls = scripted(503, 200)
+
+    async def asend():
+        return send()
+
+    assert asyncio.run(retry.acall("GET", asend)).status_code == 200
+    assert retry.stats.snapshot()["attempts"] == 2
+
+
+def test_client_retries_a_flaky_server(api, server):
+    server.fail_next = 2
+    client = api.APIClient(server.base_url, retry=policy(api))
+    assert client.get("users/1").is_success()
+    assert server.requests_served == 1
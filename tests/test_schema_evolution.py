@@ -0,0 +1,34 @@
+import io
+import json
+
+import pytest
+
+CURRENT = {"id": 1, "name": "Bob", "email": "bob@example.com"}
+ALIASED = {"id": 1, "full_name": "Bob", "email": "bob@example.com"}
+V1 = {"schema_version": 1, "id": 1, "username": "Bob", "mail": "bob@example.com"}
+
+
+@pytest.mark.parametrize("payload", [CURRENT, ALIASED, V1])
+def test_every_decoder_reads_every_schema(models, payload):
+    expected = models.User(id=1, name="Bob", email="bob@example.com")
+    assert models.User.from_dict(payload) == expected
+    assert models.User.from_dict_shared({"$id": 0, **payload}, {}) == expected
+    assert models.ModelPool().load(models.User, payload) == expected
+    view = models.lazy(models.User, payload)
+    assert (view.name, view.email) == ("Bob", "bob@example.com")
+    assert view.materialize() == expected
+
+
+def test_read_ndjson_with_pool_reads_old_schema(models):
+    lines = io.BytesIO(json.dumps(V1).encode() + b"\n" + json.dumps(ALIASED).encode() + b"\n")
+    users = list(models.read_ndjson(lines, models.User, pool=models.ModelPool()))
+    assert [u.name for u in users] == ["Bob", "Bob"]
+
+
+def test_missing_field_is_named_not_its_alias(models):
+    with pytest.raises(KeyError) as info:
+        models.User.from_dict({"id": 1})
+    assert info.value.args == ("name",)
+    with pytest.raises(KeyError) as info:
+        models.ModelPool().load(models.User, {"id": 1})
+    assert info.value.args == ("name",)
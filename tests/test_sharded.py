@@ -0,0 +1,83 @@
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+EXERCISE = Path(__file__).resolve().parent.parent / "03_exercise_async.py"
+
+# Spawned workers unpickle fn and _shard_worker by module name, and a pytest
+# process can't hand them that: run each scenario as a script, the way the
+# benchmarks do (the script re-registers the module in every child)
+SCRIPT = textwrap.dedent("""
+    import asyncio, importlib.util, json, multiprocessing, sys
+
+    spec = importlib.util.spec_from_file_location("exercise_async", {path!r})
+    aio = importlib.util.module_from_spec(spec)
+    sys.modules["exercise_async"] = aio
+    spec.loader.exec_module(aio)
+
+    async def square(x):
+        await asyncio.sleep(0)
+        if x % 97 == 0:
+            raise ValueError(x)
+        return x * x
+
+    if __name__ == "__main__":
+        kwargs = json.loads(sys.argv[1])
+        stop_after = kwargs.pop("stop_after", None)
+        outcomes = []
+        for outcome in aio.run_sharded(square, range(kwargs.pop("n")), **kwargs):
+            outcomes.append([outcome.item, outcome.result, repr(outcome.error)])
+            if len(outcomes) == stop_after:
+                break
+        print(json.dumps({{"outcomes": outcomes,
+                          "children": len(multiprocessing.active_children())}}))
+""")
+
+
+def run_script(tmp_path, **kwargs):
+    script = tmp_path / "sharded.py"
+    script.write_text(SCRIPT.format(path=str(EXERCISE)))
+    done = subprocess.run([sys.executable, str(script), json.dumps(kwargs)],
+                          capture_output=True, text=True, timeout=120)
+    assert done.returncode == 0, done.stderr
+    return json.loads(done.stdout)
+
+
+@pytest.mark.parametrize("use_uvloop", [True, False])
+def test_every_item_comes_back_once(tmp_path, use_uvloop):
+    out = run_script(tmp_path, n=2000, processes=2, chunk_size=100, use_uvloop=use_uvloop)
+    outcomes = out["outcomes"]
+    assert sorted(item for item, _, _ in outcomes) == list(range(2000))
+    failed = sorted(item for item, _, error in outcomes if error != "None")
+    assert failed == [x for x in range(2000) if x % 97 == 0]
+    assert all(result == item * item for item, result, error in outcomes if error == "None")
+    assert out["children"] == 0
+
+
+def test_stopping_early_terminates_the_workers(tmp_path):
+    out = run_script(tmp_path, n=1_000_000, processes=2, chunk_size=100, stop_after=10)
+    assert len(out["outcomes"]) == 10
+    assert out["children"] == 0
+
+
+def loop_module(aio, **kwargs):
+    async def main():
+        return type(asyncio.get_running_loop()).__module__
+    return aio.run_async(main(), **kwargs)
+
+
+def test_run_async_uses_uvloop_when_installed(aio):
+    if not aio.HAS_UVLOOP:
+        pytest.skip("uvloop not installed")
+    assert loop_module(aio).startswith("uvloop")
+
+
+def test_run_async_falls_back_to_the_stock_loop(aio, monkeypatch):
+    assert loop_module(aio, use_uvloop=False).startswith("asyncio")
+    monkeypatch.setattr(aio, "HAS_UVLOOP", False)
+    assert loop_module(aio).startswith("asyncio")
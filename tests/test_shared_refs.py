@@ -0,0 +1,48 @@
+import json
+
+
+def post_by(models, author, commenters):
+    return models.PostWithComments(id=1, title="Post", author=author, comments=[
+        models.Comment(id=i, text=f"c{i}", author=user) for i, user in enumerate(commenters)
+    ])
+
+
+def test_shared_objects_round_trip_as_one_instance(models):
+    alice, bob = models.User(id=1, name="Alice"), models.User(id=2, name="Bob")
+    post = post_by(models, alice, [alice, bob, alice, bob])
+    decoded = models.loads_shared(models.PostWithComments, models.dumps_shared(post))
+    assert decoded == post
+    assert decoded.comments[0].author is decoded.author is decoded.comments[2].author
+    assert decoded.comments[1].author is decoded.comments[3].author
+    assert decoded.comments[1].author is not decoded.author
+
+
+def test_only_shared_objects_get_an_id(models):
+    alice, bob = models.User(id=1, name="Alice"), models.User(id=2, name="Bob")
+    data = json.loads(models.dumps_shared(post_by(models, alice, [alice, bob])))
+    assert "$id" not in data and "$id" not in data["comments"][1]["author"]
+    assert all("$id" not in comment for comment in data["comments"])
+    assert data["comments"][0]["author"] == {"$ref": data["author"]["$id"]}
+
+
+def test_nothing_shared_is_plain_to_dict(models):
+    post = post_by(models, models.User(id=1, name="Alice"), [models.User(id=2, name="Bob")])
+    assert json.loads(models.dumps_shared(post)) == post.to_dict()
+    assert models.loads_shared(models.PostWithComments, json.dumps(post.to_dict())) == post
+
+
+def test_equal_but_distinct_objects_stay_distinct(models):
+    twins = [models.User(id=1, name="Alice"), models.User(id=1, name="Alice")]
+    decoded = models.loads_shared(models.PostWithComments,
+                                  models.dumps_shared(post_by(models, twins[0], twins)))
+    assert decoded.comments[0].author is decoded.author
+    assert decoded.comments[1].author is not decoded.author
+
+
+def test_ids_are_unique_with_several_shared_objects(models):
+    users = [models.User(id=i, name=f"U{i}") for i in range(5)]
+    post = post_by(models, users[0], users + users[::-1])
+    text = models.dumps_shared(post)
+    decoded = models.loads_shared(models.PostWithComments, text)
+    assert [c.author.id for c in decoded.comments] == [u.id for u in users + users[::-1]]
+    assert len({id(c.author) for c in decoded.comments}) == 5
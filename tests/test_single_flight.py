@@ -0,0 +1,37 @@
+import asyncio
+
+
+def test_identical_gets_share_one_upstream_request(api, server):
+    server.latency = 0.05  # keep the request in flight while callers pile up
+
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            responses = await asyncio.gather(*(client.get("users/1") for _ in range(100)))
+        return client, responses
+
+    client, responses = asyncio.run(main())
+    assert server.requests_served == 1
+    assert client.single_flight.calls == 1
+    assert all(r is responses[0] for r in responses)
+    assert responses[0].data["id"] == 1
+
+
+def test_coalesce_false_sends_every_request(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url, coalesce=False) as client:
+            await asyncio.gather(*(client.get("users/1") for _ in range(5)))
+
+    asyncio.run(main())
+    assert server.requests_served == 5
+
+
+def test_key_is_forgotten_once_the_call_finishes(api, server):
+    async def main():
+        async with api.AsyncAPIClient(server.base_url) as client:
+            await client.get("users/1")
+            await client.get("users/1")
+        return client
+
+    client = asyncio.run(main())
+    assert client.single_flight.calls == 2
+    assert server.requests_served == 2
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+
+def users(models, n=10):
+    return [models.User(id=i, name=["Alice", "Bob", None][i % 3],
+                        email=f"{i}@example.com" if i % 2 else None) for i in range(n)]
+
+
+def test_round_trip(models):
+    rows = users(models)
+    batch = models.UserBatch.from_users(rows)
+    assert batch.to_users() == rows
+    assert [batch[i] for i in range(len(batch))] == rows
+    assert models.UserBatch.from_json(batch.to_json()).to_users() == rows
+    assert batch.select("id", "name")["name"] == [u.name for u in rows]
+
+
+def test_filters_and_none_names(models):
+    rows = users(models)
+    batch = models.UserBatch.from_users(rows)
+    nameless = batch.filter(batch.name_equals(None))
+    assert [u.id for u in nameless.to_users()] == [u.id for u in rows if u.name is None]
+    mask = batch.id_between(2, 8) & batch.email_endswith("@example.com") \
+        if models.HAS_NUMPY else [a and b for a, b in zip(batch.id_between(2, 8),
+                                                          batch.email_endswith("@example.com"))]
+    assert [u.id for u in batch.filter(mask).to_users()] == [3, 5, 7]
+
+
+def test_empty_batch(models):
+    batch = models.UserBatch.from_users([])
+    assert len(batch) == 0 and batch.to_users() == [] and json.loads(batch.to_json()) == []
+    assert len(batch.filter(batch.name_equals("Alice"))) == 0
+    assert batch.select("id", "email") == {"id": [], "email": []}
+
+
+def test_append_after_freeze(models):
+    rows = users(models, 4)
+    batch = models.UserBatch.from_users(rows)
+    batch.append(99, "Zed", "zed@example.com")
+    batch.append(100, None)
+    assert len(batch) == 6
+    assert batch.to_users()[:4] == rows
+    assert batch[4] == models.User(id=99, name="Zed", email="zed@example.com")
+    assert batch[5] == models.User(id=100, name=None, email=None)
+    batch.freeze()
+    assert [u.id for u in batch.filter(batch.id_between(99, 200)).to_users()] == [99, 100]
+
+
+def test_appending_to_a_filtered_batch_leaves_the_parent_alone(models):
+    batch = models.UserBatch.from_users(users(models, 6))
+    bobs = batch.filter(batch.name_equals("Bob"))
+    bobs.append(7, "Eve")
+    assert "Eve" not in batch.names.values
+    assert len(batch) == 6 and [u.name for u in bobs.to_users()] == ["Bob", "Bob", "Eve"]
+
+
+@pytest.mark.parametrize("n", [0, 3])
+def test_freeze_and_thaw_are_idempotent(models, n):
+    batch = models.UserBatch.from_users(users(models, n))
+    rows = batch.to_users()
+    assert batch.freeze().freeze().thaw().thaw().to_users() == rows
@@ -0,0 +1,26 @@
+import pytest
+
+
+def test_default_format_needs_no_optional_package(models):
+    user = models.User(id=1, name="Alice")
+    data = models.dumps_wire(user)
+    assert data.startswith(b"{")
+    assert models.loads_wire(models.User, data) == user
+
+
+@pytest.mark.parametrize("positional", [False, True])
+def test_every_installed_format_round_trips(models, positional):
+    author = models.User(id=1, name="Alice", email="alice@example.com")
+    post = models.PostWithComments(id=1, title="T", author=author,
+                                   comments=[models.Comment(id=1, text="c", author=author)])
+    for fmt in models.WIRE_FORMATS:
+        data = models.dumps_wire(post, fmt, positional)
+        assert models.loads_wire(models.PostWithComments, data, fmt, positional) == post
+
+
+def test_missing_format_names_the_package(models, monkeypatch):
+    monkeypatch.delitem(models.WIRE_FORMATS, "msgpack", raising=False)
+    with pytest.raises(RuntimeError, match="pip3 install msgpack"):
+        models.dumps_wire(models.User(id=1, name="Alice"), "msgpack")
+    with pytest.raises(ValueError, match="unknown wire format"):
+        models.dumps_wire(models.User(id=1, name="Alice"), "xml")